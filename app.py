@@ -1,10 +1,25 @@
+import hashlib
+import io
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
 import streamlit as st
-import pandas as pd
-from src.data_loader import load_excel_data, get_numeric_columns, get_categorical_columns
-from src.visualizations import create_histogram, create_bar_chart, create_scatter_plot
-from src.cost_calculator import LLMCostCalculator
-from src.token_calculator import estimate_tokens
+from src.data_loader import load_pricing_snapshots
+from src.pricing_store import PricingStore
+from src.token_calculator import estimate_tokens, estimate_tokens_stream
+from src.scenario_queue import ScenarioQueue, params_hash
+from src.budget_guard import BudgetGuard
+from src.request_log import read_request_log
+from src.export import EXPORT_FORMATS, available_formats, export_columns, export_request_costs, export_rows
+from src.visualizations import (
+    create_bar_chart,
+    create_contour,
+    create_heatmap,
+    create_line_chart,
+    create_step_chart,
+)
 from src.styles import load_css
+# NumPy-backed modules (cost_matrix, sensitivity, attribution) are imported by the pages that use them
 
 # Page config
 st.set_page_config(
@@ -16,16 +31,180 @@ st.set_page_config(
 # Load and inject CSS
 st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
+@st.cache_resource
+def get_pricing_snapshots():
+    """Read every pricing snapshot once per server process instead of on every rerun"""
+    return load_pricing_snapshots()
+
+@st.cache_resource
+def get_pricing_store():
+    """Build the versioned price index once for the cached snapshots"""
+    return PricingStore.from_dataframes(get_pricing_snapshots())
+
+@st.cache_resource
+def get_cost_calculator(effective_date):
+    """Calculator with the prices in effect on the selected snapshot date"""
+    return get_pricing_store().calculator_at(effective_date)
+
+@st.cache_resource
+def get_scenario_queue(effective_date):
+    """One background sweep runner per pricing snapshot, shared by every session"""
+    return ScenarioQueue(get_cost_calculator(effective_date))
+
+@st.cache_data
+def replay_budget_log(log_bytes, pricing_date, model_budget, tenant_budget, reroute):
+    """Replay a JSONL request log through a fresh BudgetGuard, cached per log and settings"""
+    guard = BudgetGuard(
+        get_cost_calculator(pricing_date),
+        default_model_budget=model_budget or None,
+        default_tenant_budget=tenant_budget or None
+    )
+    results = list(guard.replay(read_request_log(io.BytesIO(log_bytes)), reroute=reroute))
+    return results, guard.skipped_requests
+
+@st.cache_data
+def attribute_log(log_bytes, dimensions, max_groups, top_n):
+    """Cost a JSONL request log and keep the top spenders per dimension, cached per log and settings"""
+    from src.attribution import attribute_log_costs
+
+    attributions, unpriced_requests = attribute_log_costs(
+        read_request_log(io.BytesIO(log_bytes)),
+        get_pricing_store(),
+        dimensions=dimensions,
+        max_groups=max_groups
+    )
+    by_dimension = {
+        dimension: {
+            'exact': attribution.exact,
+            'total_cost': attribution.total_cost,
+            'total_requests': attribution.total_requests,
+            'top': attribution.top(top_n),
+        }
+        for dimension, attribution in attributions.items()
+    }
+    return by_dimension, unpriced_requests
+
+EXPORT_DIRECTORY = Path(tempfile.gettempdir()) / "llm_cost_exports"
+
+@st.cache_resource(max_entries=64)
+def export_file(export_key, fmt, _write):
+    """Write an export once per content key and format; later downloads reuse the file"""
+    EXPORT_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    path = EXPORT_DIRECTORY / f"{export_key}{EXPORT_FORMATS[fmt][1]}"
+    _write(path, fmt)
+    return path
+
+def download_export(label, export_params, write, file_stem, key):
+    """Download button serving a cached export file in the sidebar-selected format"""
+    path = export_file(params_hash(export_params), export_format, write)
+    with open(path, "rb") as f:
+        st.download_button(
+            label,
+            f,
+            file_name=f"{file_stem}{EXPORT_FORMATS[export_format][1]}",
+            mime=EXPORT_FORMATS[export_format][0],
+            key=key
+        )
+
+def breakdown_rows(strategy, classifier, classifier_cost, models, percentages, model_costs, queries_per_day):
+    """Rows of the detailed cost breakdown, for export"""
+    rows = [{
+        'strategy': strategy,
+        'component': 'Classifier',
+        'model': classifier,
+        'share_pct': 100,
+        'queries': queries_per_day,
+        'input_cost': classifier_cost['input_cost'],
+        'output_cost': classifier_cost['output_cost'],
+        'total_cost': classifier_cost['total_cost'],
+    }]
+    for i, (model, percentage, cost) in enumerate(zip(models, percentages, model_costs)):
+        rows.append({
+            'strategy': strategy,
+            'component': f'Model {i+1}',
+            'model': model,
+            'share_pct': percentage,
+            'queries': int(queries_per_day * (percentage/100)),
+            'input_cost': cost['input_cost'],
+            'output_cost': cost['output_cost'],
+            'total_cost': cost['total_cost'],
+        })
+    return rows
+
+def strategy_inputs(label, key_prefix, model_options):
+    """Collect a single-model or classifier-routed strategy definition"""
+    from src.sensitivity import single_model_strategy
+
+    st.write(f"### {label}")
+    kind = st.radio("Strategy Type", ["Single Model", "Multi-Model"], horizontal=True, key=f"{key_prefix}_kind")
+    if kind == "Single Model":
+        model = st.selectbox("Model:", model_options, key=f"{key_prefix}_model")
+        return single_model_strategy(model)
+    
+    classifier = st.selectbox(
+        "Query Classification Model:",
+        model_options,
+        key=f"{key_prefix}_classifier",
+        help="Model used to classify and route queries"
+    )
+    num_models = st.number_input("Number of Models", min_value=2, max_value=5, value=2, key=f"{key_prefix}_count")
+    
+    models = []
+    percentages = []
+    total_percentage = 0
+    for i in range(num_models):
+        models.append(st.selectbox(f"Model {i+1}:", model_options, key=f"{key_prefix}_model_{i}"))
+        if i == num_models - 1:
+            percentage = 100 - total_percentage
+            st.write(f"Percentage: {percentage}%")
+        else:
+            percentage = st.slider(
+                f"Percentage for Model {i+1}",
+                0, 100-total_percentage,
+                value=min(50, 100-total_percentage),
+                key=f"{key_prefix}_percentage_{i}"
+            )
+        percentages.append(percentage)
+        total_percentage += percentage
+    return {'classifier': classifier, 'models': models, 'percentages': percentages}
+
+# Rows of a sweep sent to the page at once; the full result is in the download
+SWEEP_PREVIEW_ROWS = 1000
+
+# Default ranges for the break-even sweep axes
+SWEEP_RANGES = {
+    'queries_per_day': (1, 100000, (1, 10000)),
+    'avg_input_tokens': (1, 20000, (1, 5000)),
+    'avg_output_ratio': (0.1, 5.0, (0.5, 3.0)),
+    'first_model_share': (0, 100, (0, 100)),
+}
+
 # Load data
 try:
-    df = load_excel_data()
-    cost_calculator = LLMCostCalculator(df)
+    snapshots = get_pricing_snapshots()
+    snapshot_dates = [effective_date for effective_date, _ in snapshots]
+    if len(snapshots) > 1:
+        pricing_date = st.sidebar.selectbox(
+            "Pricing as of",
+            snapshot_dates,
+            index=len(snapshot_dates) - 1,
+            format_func=lambda d: d.isoformat()
+        )
+    else:
+        pricing_date = snapshot_dates[0]
+    df = snapshots[snapshot_dates.index(pricing_date)][1]
+    cost_calculator = get_cost_calculator(pricing_date)
     
     # Main navigation
     st.markdown('<div class="main-header">LLM Cost Analysis Dashboard</div>', unsafe_allow_html=True)
     analysis_type = st.sidebar.radio(
         "Choose Analysis Type",
-        ["Single Model Simulator", "Model Comparison", "Cost Visualization"]
+        ["Single Model Simulator", "Model Comparison", "Budget Guardrail", "Cost Attribution", "Cost Visualization"]
+    )
+    export_format = st.sidebar.selectbox(
+        "Export format",
+        available_formats(),
+        help="Parquet and Arrow need the pyarrow package"
     )
     
     if analysis_type == "Single Model Simulator":
@@ -48,7 +227,7 @@ try:
                 key="input_text_single",
             )
             
-            input_tokens = estimate_tokens(user_input)
+            input_tokens = estimate_tokens(user_input, selected_model)
             estimated_output = int(input_tokens * 2) if 'gpt-4' in selected_model.lower() else int(input_tokens * 1.5)
             
             st.write("### Token Estimates")
@@ -72,13 +251,36 @@ try:
                 st.metric("Output Cost", f"${costs['output_cost']:.4f}")
             with cost_cols[2]:
                 st.metric("Total Cost", f"${costs['total_cost']:.4f}")
+            
+            st.write("### 📄 Context Window Check")
+            context_window = st.number_input(
+                "Context Window (tokens):",
+                min_value=1,
+                value=128000,
+                key="context_window_single"
+            )
+            document = st.file_uploader(
+                "Long document",
+                type=["txt", "md", "json", "jsonl", "csv"],
+                key="context_document_single"
+            )
+            if document is not None:
+                # Reads the upload in chunks and stops as soon as the window is exceeded
+                document.seek(0)
+                document_tokens, exceeds = estimate_tokens_stream(
+                    document, threshold=context_window, model=selected_model
+                )
+                if exceeds:
+                    st.warning(f"Exceeds the {context_window:,}-token window (stopped after ~{document_tokens:,} tokens).")
+                else:
+                    st.success(f"Fits: ~{document_tokens:,} of {context_window:,} tokens.")
     
     elif analysis_type == "Model Comparison":
         st.subheader("Model Strategy Comparison")
         
         comparison_type = st.radio(
             "What would you like to compare?",
-            ["Single vs Single Model", "Single vs Multi-Model Strategy", "Compare Multi-Model Strategies"],
+            ["Single vs Single Model", "Single vs Multi-Model Strategy", "Compare Multi-Model Strategies", "Pairwise Cost Matrix", "Break-even Analysis", "Scenario Sweep"],
             help="Choose how you want to compare different model strategies"
         )
         
@@ -330,6 +532,232 @@ try:
                     - Total daily cost: ${cost['total_cost']:,.2f}
                     - Cost per query: ${cost['total_cost'] / queries:,.4f}
                     """)
+                
+                single_rows = [{
+                    'strategy': 'Single Model',
+                    'component': 'Model',
+                    'model': single_model,
+                    'share_pct': 100,
+                    'queries': queries_per_day,
+                    'input_cost': single_daily_cost['input_cost'],
+                    'output_cost': single_daily_cost['output_cost'],
+                    'total_cost': single_daily_cost['total_cost'],
+                }]
+                comparison_rows = single_rows + breakdown_rows(
+                    'Multi-Model', classifier_model, classifier_daily_cost,
+                    models, percentages, model_costs, queries_per_day
+                )
+                download_export(
+                    "Download breakdown",
+                    comparison_rows,
+                    lambda path, fmt: export_rows(comparison_rows, path, fmt),
+                    "single_vs_multi_breakdown",
+                    key="export_single_vs_multi"
+                )
+        
+        elif comparison_type == "Pairwise Cost Matrix":
+            st.write("### Cost Difference Between Every Pair of Models")
+            import numpy as np
+            from src.cost_matrix import pairwise_cost_matrix
+            
+            period = st.radio("Period", ["Daily", "Annual"], horizontal=True, key="matrix_period")
+            
+            # One broadcasted pass over the price arrays for the current usage profile
+            models, deltas = pairwise_cost_matrix(
+                cost_calculator,
+                queries_per_day,
+                avg_input_tokens,
+                avg_output_ratio,
+                days=365 if period == "Annual" else 1
+            )
+            labels = [str(model) for model in models]
+            st.plotly_chart(
+                create_heatmap(
+                    deltas[0],
+                    labels,
+                    labels,
+                    f"{period} cost of row model minus column model",
+                    colorbar_title="$ difference"
+                ),
+                use_container_width=True
+            )
+            st.caption("Positive (red) cells mean the row model costs more than the column model.")
+            
+            matrix_columns = {
+                'model_a': np.repeat(models, len(models)),
+                'model_b': np.tile(models, len(models)),
+                f'{period.lower()}_difference': deltas[0].ravel(),
+            }
+            download_export(
+                "Download matrix",
+                [pricing_date, queries_per_day, avg_input_tokens, avg_output_ratio, period],
+                lambda path, fmt: export_columns(matrix_columns, path, fmt),
+                f"pairwise_{period.lower()}_cost_matrix",
+                key="export_matrix"
+            )
+        
+        elif comparison_type == "Break-even Analysis":
+            import numpy as np
+            from src.sensitivity import (
+                SWEEP_PARAMETERS,
+                break_even_points,
+                cost_difference_surface,
+                strategy_daily_cost,
+            )
+            
+            model_options = df[cost_calculator.model_column].unique()
+            strategy_col_a, strategy_col_b = st.columns(2)
+            with strategy_col_a:
+                strategy_a = strategy_inputs("Strategy A", "breakeven_a", model_options)
+            with strategy_col_b:
+                strategy_b = strategy_inputs("Strategy B", "breakeven_b", model_options)
+            
+            st.write("### Sweep Parameters")
+            param_names = list(SWEEP_PARAMETERS)
+            axis_col1, axis_col2, axis_col3 = st.columns(3)
+            with axis_col1:
+                x_param = st.selectbox("X axis", param_names, format_func=SWEEP_PARAMETERS.get, key="breakeven_x")
+                x_min, x_max, x_default = SWEEP_RANGES[x_param]
+                x_range = st.slider("X range", x_min, x_max, x_default, key=f"breakeven_x_range_{x_param}")
+            with axis_col2:
+                y_options = [name for name in param_names if name != x_param]
+                y_param = st.selectbox("Y axis", y_options, format_func=SWEEP_PARAMETERS.get, key="breakeven_y")
+                y_min, y_max, y_default = SWEEP_RANGES[y_param]
+                y_range = st.slider("Y range", y_min, y_max, y_default, key=f"breakeven_y_range_{y_param}")
+            with axis_col3:
+                resolution = st.slider("Grid resolution", 50, 400, 200, step=50, key="breakeven_resolution")
+            
+            base_params = {
+                'queries_per_day': queries_per_day,
+                'avg_input_tokens': avg_input_tokens,
+                'avg_output_ratio': avg_output_ratio,
+                'first_model_share': None,
+            }
+            x_values = np.linspace(x_range[0], x_range[1], resolution)
+            y_values = np.linspace(y_range[0], y_range[1], resolution)
+            
+            # Break-even along the X axis with every other parameter at its current value
+            line_params = dict(base_params, **{x_param: x_values})
+            cost_a = strategy_daily_cost(cost_calculator, strategy_a, **line_params)
+            cost_b = strategy_daily_cost(cost_calculator, strategy_b, **line_params)
+            crossings = break_even_points(x_values, cost_a - cost_b)
+            
+            st.plotly_chart(
+                create_line_chart(
+                    x_values,
+                    {"Strategy A": cost_a, "Strategy B": cost_b},
+                    SWEEP_PARAMETERS[x_param],
+                    "Daily Cost ($)",
+                    f"Daily cost vs {SWEEP_PARAMETERS[x_param]}",
+                    markers=crossings
+                ),
+                use_container_width=True
+            )
+            if len(crossings):
+                st.write("**Break-even at:** " + ", ".join(f"{point:,.2f}" for point in crossings))
+            else:
+                # Without a crossing every nonzero difference has the same sign
+                differences = (cost_a - cost_b)[cost_a != cost_b]
+                if len(differences) == 0:
+                    st.write("No break-even in this range: both strategies cost the same throughout.")
+                else:
+                    cheaper = "A" if differences[0] < 0 else "B"
+                    st.write(f"No break-even in this range: Strategy {cheaper} is cheaper throughout.")
+            
+            # Sensitivity surface over both axes in one vectorized pass
+            surface = cost_difference_surface(
+                cost_calculator, strategy_a, strategy_b, base_params,
+                x_param, x_values, y_param, y_values
+            )
+            st.plotly_chart(
+                create_contour(
+                    surface,
+                    x_values,
+                    y_values,
+                    SWEEP_PARAMETERS[x_param],
+                    SWEEP_PARAMETERS[y_param],
+                    "Daily cost of A minus B (black line = break-even)",
+                    colorbar_title="$ difference"
+                ),
+                use_container_width=True
+            )
+            
+            grid_x, grid_y = np.meshgrid(x_values, y_values)
+            surface_columns = {
+                x_param: grid_x.ravel(),
+                y_param: grid_y.ravel(),
+                'daily_cost_difference': surface.ravel(),
+            }
+            download_export(
+                "Download sensitivity grid",
+                [pricing_date, strategy_a, strategy_b, base_params, x_param, x_range, y_param, y_range, resolution],
+                lambda path, fmt: export_columns(surface_columns, path, fmt),
+                "break_even_sensitivity_grid",
+                key="export_surface"
+            )
+        
+        elif comparison_type == "Scenario Sweep":
+            st.write("### Every Model Pair Across Traffic Levels")
+            all_models = list(df[cost_calculator.model_column].unique())
+            sweep_models = st.multiselect(
+                "Models to sweep:",
+                all_models,
+                default=all_models,
+                key="sweep_models"
+            )
+            sweep_col1, sweep_col2, sweep_col3 = st.columns(3)
+            with sweep_col1:
+                min_queries = st.number_input("Minimum Queries per Day", min_value=1, value=100, key="sweep_min_queries")
+            with sweep_col2:
+                max_queries = st.number_input("Maximum Queries per Day", min_value=1, value=100000, key="sweep_max_queries")
+            with sweep_col3:
+                num_levels = st.number_input("Traffic Levels", min_value=2, max_value=100, value=20, key="sweep_levels")
+            
+            step = (max_queries - min_queries) / (num_levels - 1)
+            traffic_levels = [int(min_queries + step * i) for i in range(num_levels)]
+            scenario_queue = get_scenario_queue(pricing_date)
+            
+            # Sweeps are only submitted on an explicit button press; reruns just re-read the job
+            if len(sweep_models) < 2:
+                st.info("Select at least two models to sweep.")
+            elif st.button("Run Sweep", key="run_sweep"):
+                job = scenario_queue.submit_pair_sweep(
+                    sweep_models, traffic_levels, avg_input_tokens, avg_output_ratio
+                )
+                st.session_state["sweep_job_id"] = job.job_id
+            
+            job_id = st.session_state.get("sweep_job_id")
+            job = scenario_queue.get(job_id) if job_id else None
+            if job_id and job is None:
+                st.info("The last sweep is no longer cached. Press Run Sweep to run it again.")
+            
+            if job is not None:
+                current_params = scenario_queue.pair_sweep_params(
+                    sweep_models, traffic_levels, avg_input_tokens, avg_output_ratio
+                )
+                if job.params != current_params:
+                    st.caption("Showing the last submitted sweep. Press Run Sweep to apply the current settings.")
+                elif job.done():
+                    st.caption("Loaded cached sweep results.")
+                
+                # Stream progress, but only send a capped preview of the newest chunk to the page
+                progress = st.progress(0.0)
+                preview = st.empty()
+                for finished, (_, rows) in enumerate(job.iter_results(), start=1):
+                    progress.progress(finished / job.total_chunks)
+                    preview.dataframe(rows[:SWEEP_PREVIEW_ROWS], use_container_width=True)
+                st.caption(
+                    f"Preview of the last finished traffic level (up to {SWEEP_PREVIEW_ROWS:,} rows). "
+                    "Download the sweep for every row."
+                )
+                
+                download_export(
+                    "Download sweep",
+                    [pricing_date, job.job_id],
+                    lambda path, fmt: export_rows(job.result(), path, fmt),
+                    "scenario_sweep",
+                    key="export_sweep"
+                )
         
         else:  # Compare Multi-Model Strategies
             strategy_1, strategy_2 = st.columns(2)
@@ -572,6 +1000,192 @@ try:
                     - Total daily cost: ${cost['total_cost']:,.2f}
                     - Cost per query: ${cost['total_cost'] / queries:,.4f}
                     """)
+                
+                comparison_rows = breakdown_rows(
+                    'Strategy 1', classifier_1, classifier_daily_cost_1,
+                    models_1, percentages_1, model_costs_1, queries_per_day
+                ) + breakdown_rows(
+                    'Strategy 2', classifier_2, classifier_daily_cost_2,
+                    models_2, percentages_2, model_costs_2, queries_per_day
+                )
+                download_export(
+                    "Download breakdown",
+                    comparison_rows,
+                    lambda path, fmt: export_rows(comparison_rows, path, fmt),
+                    "strategy_comparison_breakdown",
+                    key="export_strategy_comparison"
+                )
+    
+    elif analysis_type == "Budget Guardrail":
+        st.subheader("Budget Guardrail Replay")
+        st.write("Replay a request log through the rolling 24-hour budget checks to see when limits would have tripped.")
+        
+        log_file = st.file_uploader(
+            "Request log (JSONL)",
+            type=["jsonl", "json"],
+            help="One request per line with timestamp, model, optional tenant and usage or prompt/completion text"
+        )
+        budget_col1, budget_col2, budget_col3 = st.columns(3)
+        with budget_col1:
+            model_budget = st.number_input("Daily Budget per Model ($)", min_value=0.0, value=100.0, help="0 means unlimited")
+        with budget_col2:
+            tenant_budget = st.number_input("Daily Budget per Tenant ($)", min_value=0.0, value=0.0, help="0 means unlimited")
+        with budget_col3:
+            reroute = st.checkbox("Reroute to cheapest model within budget", value=True)
+        
+        if log_file is not None:
+            results, skipped_requests = replay_budget_log(
+                log_file.getvalue(), pricing_date, model_budget, tenant_budget, reroute
+            )
+            if skipped_requests:
+                st.warning(
+                    f"{skipped_requests:,} requests were skipped (model not in the {pricing_date.isoformat()} "
+                    "pricing sheet, or missing timestamp) and are not part of this replay."
+                )
+            tripped = [result for result in results if not result['allowed']]
+            rerouted = [result for result in tripped if result['served_model'] is not None]
+            
+            metric_cols = st.columns(4)
+            with metric_cols[0]:
+                st.metric("Requests", f"{len(results):,}")
+            with metric_cols[1]:
+                st.metric("Over Budget", f"{len(tripped):,}")
+            with metric_cols[2]:
+                st.metric("Rerouted", f"{len(rerouted):,}")
+            with metric_cols[3]:
+                st.metric("Blocked", f"{len(tripped) - len(rerouted):,}")
+            
+            # Rolling spend per model as recorded, so rerouted requests count for the model that served them
+            spend_series = {}
+            for result in results:
+                if result['served_model'] is None:
+                    continue
+                times, spend = spend_series.setdefault(result['served_model'], ([], []))
+                times.append(datetime.fromtimestamp(result['timestamp'], tz=timezone.utc))
+                spend.append(result['served_model_spend'])
+            st.plotly_chart(
+                create_step_chart(
+                    spend_series,
+                    "Time (UTC)",
+                    "Rolling 24h Spend ($)",
+                    "Rolling spend per model",
+                    threshold=model_budget or None
+                ),
+                use_container_width=True
+            )
+            
+            if tripped:
+                st.write("### Budget Trips")
+                st.dataframe(
+                    [
+                        {
+                            'time (UTC)': datetime.fromtimestamp(result['timestamp'], tz=timezone.utc),
+                            'model': result['model'],
+                            'tenant': result['tenant'],
+                            'cost': result['cost'],
+                            'model spend': result['model_spend'],
+                            'tenant spend': result['tenant_spend'],
+                            'served by': result['served_model'] or 'blocked',
+                        }
+                        for result in tripped
+                    ],
+                    use_container_width=True
+                )
+            else:
+                st.success("No budget limits would have tripped for this log.")
+            
+            download_export(
+                "Download replay results",
+                [hashlib.sha256(log_file.getvalue()).hexdigest(), pricing_date, model_budget, tenant_budget, reroute],
+                lambda path, fmt: export_rows(results, path, fmt),
+                "budget_replay",
+                key="export_budget_replay"
+            )
+    
+    elif analysis_type == "Cost Attribution":
+        st.subheader("Cost Attribution")
+        st.write("Break logged spend down by tenant, feature, user or model. Each request is priced with the snapshot in effect at its timestamp.")
+        
+        log_file = st.file_uploader(
+            "Request log (JSONL)",
+            type=["jsonl", "json"],
+            key="attribution_log",
+            help="One request per line with model, usage or prompt/completion text, and any of tenant, feature, user"
+        )
+        from src.attribution import ATTRIBUTION_DIMENSIONS
+        
+        attribution_col1, attribution_col2, attribution_col3 = st.columns(3)
+        with attribution_col1:
+            dimensions = st.multiselect(
+                "Group by",
+                list(ATTRIBUTION_DIMENSIONS),
+                default=["tenant", "feature", "user"],
+                key="attribution_dimensions"
+            )
+        with attribution_col2:
+            top_n = st.slider("Top N spenders", 5, 100, 20, key="attribution_top_n")
+        with attribution_col3:
+            max_groups = st.number_input(
+                "Exact groups before sketching",
+                min_value=1000,
+                value=100000,
+                step=1000,
+                help="Past this many distinct keys, a Space-Saving sketch tracks the top spenders in bounded memory"
+            )
+        
+        if log_file is not None and dimensions:
+            results, unpriced_requests = attribute_log(log_file.getvalue(), tuple(dimensions), max_groups, top_n)
+            if unpriced_requests:
+                st.warning(
+                    f"{unpriced_requests:,} requests could not be priced (unknown model, missing timestamp, "
+                    "or dated before the first pricing snapshot) and are left out of these totals."
+                )
+            log_digest = hashlib.sha256(log_file.getvalue()).hexdigest()
+            for dimension, result in results.items():
+                st.write(f"### By {dimension}")
+                summary_cols = st.columns(2)
+                with summary_cols[0]:
+                    st.metric("Total Cost", f"${result['total_cost']:,.2f}")
+                with summary_cols[1]:
+                    st.metric("Requests", f"{result['total_requests']:,}")
+                if not result['exact']:
+                    st.caption("Too many distinct keys for exact totals: costs are Space-Saving estimates, at most cost_error above the true value.")
+                
+                top_rows = result['top']
+                st.plotly_chart(
+                    create_bar_chart(
+                        {dimension: [row[dimension] for row in top_rows], 'cost': [row['cost'] for row in top_rows]},
+                        dimension,
+                        'cost'
+                    ),
+                    use_container_width=True
+                )
+                st.dataframe(top_rows, use_container_width=True)
+                download_export(
+                    f"Download top spenders by {dimension}",
+                    [log_digest, dimension, max_groups, top_n],
+                    lambda path, fmt, rows=top_rows: export_rows(rows, path, fmt),
+                    f"cost_by_{dimension}",
+                    key=f"export_attribution_{dimension}"
+                )
+            
+            # The full per-request table can be large, so it is only written on request
+            st.write("### Per-Request Costs")
+            st.caption("Each request is priced with the snapshot in effect at its timestamp.")
+            prepared_logs = st.session_state.setdefault("request_costs_prepared", set())
+            if st.button("Prepare per-request cost export", key="prepare_request_costs"):
+                prepared_logs.add(log_digest)
+            if log_digest in prepared_logs:
+                log_bytes = log_file.getvalue()
+                download_export(
+                    "Download per-request costs",
+                    [log_digest, 'request_costs'],
+                    lambda path, fmt: export_request_costs(
+                        read_request_log(io.BytesIO(log_bytes)), get_pricing_store(), path, fmt
+                    ),
+                    "request_costs",
+                    key="export_request_costs"
+                )
     
     elif analysis_type == "Cost Visualization":
         st.subheader("Cost Visualization")
@@ -586,6 +1200,7 @@ try:
         - Longer words: ~1 token per 4 characters
         - Numbers and punctuation are usually more efficient
         - Actual tokens may vary by model
+        - Model families calibrated with `python -m src.token_calibration` use their fitted weights
         """)
 
 except Exception as e:
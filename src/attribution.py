@@ -0,0 +1,186 @@
+import heapq
+from array import array
+from itertools import islice
+
+import numpy as np
+
+from src.pricing_store import price_record_batch
+
+ATTRIBUTION_DIMENSIONS = ('model', 'tenant', 'feature', 'user')
+MISSING_KEY = '(none)'
+
+
+def dimension_key(record, dimension):
+    """Group key for a record, accepting both "user" and "user_id" style fields"""
+    value = record.get(dimension)
+    if value is None:
+        value = record.get(f"{dimension}_id")
+    return MISSING_KEY if value is None else str(value)
+
+
+class SpaceSaving:
+    """Weighted Space-Saving sketch: top spenders in memory bounded by capacity.
+
+    A key's reported total overestimates its true total by at most its error,
+    and any key whose true total exceeds (stream total / capacity) is kept.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = {}  # key -> [total, error, requests]
+        self._heap = []  # (total, key), may hold stale totals
+
+    def _push(self, key, total):
+        heapq.heappush(self._heap, (total, key))
+        # Rebuild once stale heap entries dominate, keeping memory O(capacity)
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(entry[0], k) for k, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            total, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == total:
+                return key, entry
+
+    def add(self, key, weight, requests=1):
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.capacity:
+                evicted_key, evicted = self._pop_min()
+                del self._entries[evicted_key]
+                entry = [evicted[0], evicted[0], 0]
+            else:
+                entry = [0.0, 0.0, 0]
+            self._entries[key] = entry
+        entry[0] += weight
+        entry[2] += requests
+        self._push(key, entry[0])
+
+    def items(self):
+        """(key, total, error, requests) for every tracked key"""
+        return [(key, entry[0], entry[1], entry[2]) for key, entry in self._entries.items()]
+
+
+class CostAttribution:
+    """Cost group-by over one dimension with dictionary-encoded keys.
+
+    Groups are exact until max_groups distinct keys have been seen; after that
+    the existing totals seed a Space-Saving sketch of the same size, so memory
+    stays bounded however many users appear and the top spenders stay accurate.
+    """
+
+    def __init__(self, dimension, max_groups=100000):
+        self.dimension = dimension
+        self.max_groups = max_groups
+        self.total_cost = 0.0
+        self.total_requests = 0
+
+        self._codes = {}  # key -> dense integer code
+        self._keys = []
+        self._cost = array('d')
+        self._requests = array('q')
+        self._input_tokens = array('q')
+        self._output_tokens = array('q')
+        self._sketch = None
+
+    @property
+    def exact(self):
+        return self._sketch is None
+
+    def add(self, key, cost, input_tokens=0, output_tokens=0):
+        self.total_cost += cost
+        self.total_requests += 1
+
+        if self._sketch is not None:
+            self._sketch.add(key, cost)
+            return
+
+        code = self._codes.get(key)
+        if code is None:
+            if len(self._keys) >= self.max_groups:
+                self._switch_to_sketch()
+                self._sketch.add(key, cost)
+                return
+            code = self._codes[key] = len(self._keys)
+            self._keys.append(key)
+            self._cost.append(0.0)
+            self._requests.append(0)
+            self._input_tokens.append(0)
+            self._output_tokens.append(0)
+
+        self._cost[code] += cost
+        self._requests[code] += 1
+        self._input_tokens[code] += input_tokens
+        self._output_tokens[code] += output_tokens
+
+    def _switch_to_sketch(self):
+        self._sketch = SpaceSaving(self.max_groups)
+        for code, key in enumerate(self._keys):
+            self._sketch.add(key, self._cost[code], requests=self._requests[code])
+        self._codes = {}
+        self._keys = []
+        self._cost = array('d')
+        self._requests = array('q')
+        self._input_tokens = array('q')
+        self._output_tokens = array('q')
+
+    def top(self, n=20):
+        """Largest spenders first; approximate rows carry an upper error bound on cost"""
+        if self._sketch is None:
+            codes = heapq.nlargest(n, range(len(self._keys)), key=self._cost.__getitem__)
+            return [
+                {
+                    self.dimension: self._keys[code],
+                    'cost': self._cost[code],
+                    'requests': self._requests[code],
+                    'input_tokens': self._input_tokens[code],
+                    'output_tokens': self._output_tokens[code],
+                    'cost_error': 0.0,
+                }
+                for code in codes
+            ]
+
+        rows = heapq.nlargest(n, self._sketch.items(), key=lambda item: item[1])
+        return [
+            {
+                self.dimension: key,
+                'cost': total,
+                'requests': requests,
+                'input_tokens': None,
+                'output_tokens': None,
+                'cost_error': error,
+            }
+            for key, total, error, requests in rows
+        ]
+
+
+def attribute_log_costs(records, pricing_store, dimensions=ATTRIBUTION_DIMENSIONS, max_groups=100000,
+                        batch_size=65536):
+    """Price logged requests in batches and attribute their cost along every dimension.
+
+    Each request is priced with the snapshot in effect at its timestamp.
+    Returns (attributions, unpriced_requests); unpriced requests (unknown
+    model, missing timestamp, or dated before any price) are counted, not
+    attributed.
+    """
+    attributions = {dimension: CostAttribution(dimension, max_groups) for dimension in dimensions}
+    unpriced_requests = 0
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            return attributions, unpriced_requests
+
+        batch = price_record_batch(chunk, pricing_store)
+        unpriced_requests += int((~batch['priced']).sum())
+        costs = batch['total_cost'].tolist()
+        input_tokens = batch['input_tokens'].tolist()
+        output_tokens = batch['output_tokens'].tolist()
+        for index in np.flatnonzero(batch['priced']).tolist():
+            record = chunk[index]
+            for dimension, attribution in attributions.items():
+                attribution.add(
+                    dimension_key(record, dimension), costs[index], input_tokens[index], output_tokens[index]
+                )
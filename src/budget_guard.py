@@ -0,0 +1,214 @@
+from collections import namedtuple
+
+from src.request_log import record_timestamp, request_tokens
+
+BudgetDecision = namedtuple(
+    'BudgetDecision',
+    ['allowed', 'cost', 'model_spend', 'tenant_spend', 'fallback_model', 'fallback_cost'],
+)
+
+
+class SlidingWindowCounter:
+    """Spend over a trailing time window, kept in a ring buffer of fixed buckets.
+
+    Adding or reading is O(1) amortized: each bucket is cleared at most once
+    per lap of the ring as time moves forward.
+    """
+
+    def __init__(self, window_seconds=86400, bucket_seconds=60):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, int(window_seconds // bucket_seconds))
+        self._buckets = [0.0] * self.num_buckets
+        self._head = None  # absolute index of the newest bucket
+        self.total = 0.0
+
+    def _advance(self, bucket):
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket <= self._head:
+            return
+        if bucket - self._head >= self.num_buckets:
+            self._buckets = [0.0] * self.num_buckets
+            self.total = 0.0
+        else:
+            for expired in range(self._head + 1, bucket + 1):
+                slot = expired % self.num_buckets
+                self.total -= self._buckets[slot]
+                self._buckets[slot] = 0.0
+        self._head = bucket
+
+    def add(self, timestamp, amount):
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        # Late events still inside the window land in their own bucket; older ones are dropped
+        if self._head - bucket < self.num_buckets:
+            self._buckets[bucket % self.num_buckets] += amount
+            self.total += amount
+
+    def value(self, timestamp):
+        """Spend inside the window ending at timestamp"""
+        self._advance(int(timestamp // self.bucket_seconds))
+        return self.total
+
+
+class BudgetGuard:
+    """In-process spend tracker that checks requests against rolling budgets.
+
+    model_budgets and tenant_budgets map a model or tenant to the dollars it
+    may spend per window; anything not listed gets the matching default
+    budget, and a budget of None means unlimited.
+    """
+
+    def __init__(self, calculator, model_budgets=None, tenant_budgets=None,
+                 default_model_budget=None, default_tenant_budget=None,
+                 window_seconds=86400, bucket_seconds=60):
+        self.model_budgets = dict(model_budgets or {})
+        self.tenant_budgets = dict(tenant_budgets or {})
+        self.default_model_budget = default_model_budget
+        self.default_tenant_budget = default_tenant_budget
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+
+        # Flat price tuples keep the hot path to two multiplications per model
+        self._prices = {
+            model: (prices[calculator.input_price_col] / 1000000, prices[calculator.output_price_col] / 1000000)
+            for model, prices in calculator.models_data.items()
+        }
+        # Fallback search order: models by input price and by output price
+        self._by_input_price = sorted(self._prices, key=lambda model: self._prices[model])
+        self._by_output_price = sorted(self._prices, key=lambda model: self._prices[model][::-1])
+        self._model_spend = {}
+        self._tenant_spend = {}
+        self.skipped_requests = 0
+
+    def _counter(self, counters, key):
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = SlidingWindowCounter(self.window_seconds, self.bucket_seconds)
+        return counter
+
+    def _spend(self, counters, key, timestamp):
+        counter = counters.get(key)
+        return counter.value(timestamp) if counter is not None else 0.0
+
+    def request_cost(self, model, input_tokens, output_tokens):
+        if model not in self._prices:
+            raise ValueError(f"Model {model} not found in pricing data")
+        input_price, output_price = self._prices[model]
+        return input_tokens * input_price + output_tokens * output_price
+
+    def _fits(self, model, cost, tenant_headroom, timestamp):
+        if cost > tenant_headroom:
+            return False
+        budget = self.model_budgets.get(model, self.default_model_budget)
+        if budget is None:
+            return True
+        return self._spend(self._model_spend, model, timestamp) + cost <= budget
+
+    def check(self, model, input_tokens, output_tokens, timestamp, tenant=None):
+        """Whether a request fits its model and tenant budgets, plus the cheapest model that would.
+
+        The fallback is the model with the lowest cost for this request's own
+        input/output token mix among those whose budgets still have room.
+        """
+        cost = self.request_cost(model, input_tokens, output_tokens)
+        model_spend = self._spend(self._model_spend, model, timestamp)
+        tenant_spend = self._spend(self._tenant_spend, tenant, timestamp) if tenant is not None else 0.0
+
+        tenant_budget = self.tenant_budgets.get(tenant, self.default_tenant_budget) if tenant is not None else None
+        tenant_headroom = float('inf') if tenant_budget is None else tenant_budget - tenant_spend
+
+        allowed = self._fits(model, cost, tenant_headroom, timestamp)
+        fallback_model, fallback_cost = (None, None) if allowed else self._cheapest_fallback(
+            model, input_tokens, output_tokens, tenant_headroom, timestamp
+        )
+        return BudgetDecision(allowed, cost, model_spend, tenant_spend, fallback_model, fallback_cost)
+
+    def _cheapest_fallback(self, model, input_tokens, output_tokens, tenant_headroom, timestamp):
+        """Walk the input- and output-price orders side by side (threshold algorithm).
+
+        A model not reached yet in either order costs at least the input price
+        at the current depth of one plus the output price at the current depth
+        of the other, so the walk stops once that bound reaches the cheapest
+        fitting model found so far.
+        """
+        fallback_model = None
+        fallback_cost = None
+        seen = {model}
+        for by_input, by_output in zip(self._by_input_price, self._by_output_price):
+            for candidate in (by_input, by_output):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                input_price, output_price = self._prices[candidate]
+                candidate_cost = input_tokens * input_price + output_tokens * output_price
+                if fallback_cost is not None and candidate_cost >= fallback_cost:
+                    continue
+                if self._fits(candidate, candidate_cost, tenant_headroom, timestamp):
+                    fallback_model, fallback_cost = candidate, candidate_cost
+
+            if fallback_cost is not None:
+                bound = input_tokens * self._prices[by_input][0] + output_tokens * self._prices[by_output][1]
+                if bound >= fallback_cost:
+                    break
+        return fallback_model, fallback_cost
+
+    def record(self, model, cost, timestamp, tenant=None):
+        """Add a served request's cost to the model and tenant windows"""
+        self._counter(self._model_spend, model).add(timestamp, cost)
+        if tenant is not None:
+            self._counter(self._tenant_spend, tenant).add(timestamp, cost)
+
+    def replay(self, records, reroute=True):
+        """Run logged requests through the guard in time order, yielding one result per request.
+
+        The sliding windows only move forward, so records are sorted by
+        timestamp first. Blocked requests are rerouted to the fallback model
+        when reroute is set and one exists; otherwise they are dropped and not
+        counted as spend. Records that cannot be priced (a model missing from
+        the pricing sheet, or no usable timestamp) are skipped and counted in
+        skipped_requests.
+        """
+        timed_records = []
+        for record in records:
+            try:
+                timestamp = record_timestamp(record)
+            except (ValueError, TypeError):
+                timestamp = None
+            if timestamp is None or record.get('model') not in self._prices:
+                self.skipped_requests += 1
+                continue
+            timed_records.append((timestamp, record))
+        timed_records.sort(key=lambda timed: timed[0])
+
+        for timestamp, record in timed_records:
+            model = record['model']
+            tenant = record.get('tenant')
+            input_tokens, output_tokens = request_tokens(record)
+
+            decision = self.check(model, input_tokens, output_tokens, timestamp, tenant=tenant)
+            served_model, served_cost = model, decision.cost
+            if not decision.allowed:
+                if reroute and decision.fallback_model is not None:
+                    served_model, served_cost = decision.fallback_model, decision.fallback_cost
+                else:
+                    served_model, served_cost = None, 0.0
+
+            served_model_spend = None
+            if served_model is not None:
+                self.record(served_model, served_cost, timestamp, tenant=tenant)
+                served_model_spend = self._spend(self._model_spend, served_model, timestamp)
+
+            yield {
+                'timestamp': timestamp,
+                'model': model,
+                'tenant': tenant,
+                'cost': decision.cost,
+                'allowed': decision.allowed,
+                'served_model': served_model,
+                'served_cost': served_cost,
+                'model_spend': decision.model_spend,
+                'tenant_spend': decision.tenant_spend,
+                'served_model_spend': served_model_spend,
+            }
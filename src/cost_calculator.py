@@ -1,9 +1,9 @@
 class LLMCostCalculator:
+    # Use exact column names from the Excel file
+    input_price_col = 'Input $/M'
+    output_price_col = 'Output $/M'
+
     def __init__(self, df):
-        # Use exact column names from the Excel file
-        self.input_price_col = 'Input $/M'
-        self.output_price_col = 'Output $/M'
-        
         # Use the second column as the model name
         self.model_column = df.columns[1]
         
@@ -18,7 +18,33 @@ class LLMCostCalculator:
         # Print info for debugging
         print(f"Found {len(self.models_data)} unique models")
         print("Models available:", list(self.models_data.keys()))
+
+    @classmethod
+    def from_prices(cls, prices, model_column='Model'):
+        """Build a calculator from {model: (input $/M, output $/M)} without pandas"""
+        calculator = cls.__new__(cls)
+        calculator.model_column = model_column
+        calculator.models_data = {
+            model: {cls.input_price_col: input_price, cls.output_price_col: output_price}
+            for model, (input_price, output_price) in prices.items()
+        }
+        return calculator
     
+    def price_arrays(self):
+        """Return (models, input $/M, output $/M) as aligned NumPy arrays, built once per calculator"""
+        # models_data is not modified after construction, so the arrays never go stale
+        cached = getattr(self, '_price_arrays', None)
+        if cached is None:
+            import numpy as np
+
+            models = list(self.models_data)
+            cached = self._price_arrays = (
+                np.array(models, dtype=object),
+                np.array([self.models_data[model][self.input_price_col] for model in models], dtype=float),
+                np.array([self.models_data[model][self.output_price_col] for model in models], dtype=float),
+            )
+        return cached
+
     def calculate_cost(self, model, input_tokens, output_tokens):
         """Calculate total cost for a given model and token counts"""
         if model not in self.models_data:
@@ -32,4 +58,4 @@ class LLMCostCalculator:
             'input_cost': input_cost,
             'output_cost': output_cost,
             'total_cost': input_cost + output_cost
-        } 
\ No newline at end of file
+        } 
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def daily_costs(calculator, queries_per_day, avg_input_tokens, avg_output_ratio):
+    """Daily cost of every model for one or more usage profiles.
+
+    Usage arguments may be scalars or equal-length arrays (one entry per
+    profile). Returns (models, costs) with costs shaped (profiles, models).
+    """
+    models, input_prices, output_prices = calculator.price_arrays()
+
+    queries = np.atleast_1d(np.asarray(queries_per_day, dtype=float))
+    avg_input = np.atleast_1d(np.asarray(avg_input_tokens, dtype=float))
+    ratio = np.atleast_1d(np.asarray(avg_output_ratio, dtype=float))
+
+    # Same token totals as the single-model comparison, per profile
+    input_tokens = avg_input * queries
+    output_tokens = np.floor(avg_input * ratio) * queries
+
+    costs = (
+        input_tokens[:, None] * input_prices[None, :]
+        + output_tokens[:, None] * output_prices[None, :]
+    ) / 1000000
+    return models, costs
+
+
+def pairwise_cost_matrix(calculator, queries_per_day, avg_input_tokens, avg_output_ratio, days=1):
+    """N x N matrix of cost(row model) - cost(column model) for each usage profile.
+
+    Returns (models, deltas) with deltas shaped (profiles, models, models);
+    pass days=365 for annual figures.
+    """
+    models, costs = daily_costs(calculator, queries_per_day, avg_input_tokens, avg_output_ratio)
+    deltas = (costs[:, :, None] - costs[:, None, :]) * days
+    return models, deltas
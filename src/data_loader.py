@@ -1,19 +1,98 @@
-import pandas as pd
+import re
+from datetime import date
 from pathlib import Path
 
-def load_excel_data():
+from src.cost_calculator import LLMCostCalculator
+
+DEFAULT_PRICING_FILE = Path("data/LLM metrics dec 2024.xlsx")
+PRICING_DIRECTORY = Path("data")
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+def load_excel_data(file_path=DEFAULT_PRICING_FILE):
     """Load the Excel file from data directory"""
-    file_path = Path("data/LLM metrics dec 2024.xlsx")
+    # pandas is imported on first use so the token/cost core stays importable without it
+    import pandas as pd
+
     try:
         df = pd.read_excel(file_path)
         return df
     except Exception as e:
         raise Exception(f"Error loading Excel file: {e}")
 
+# Full month names or their exact abbreviations ("sept" too), not any word starting with one
+MONTH_PATTERN = re.compile(
+    r'\b(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?\s+(\d{4})\b'
+)
+
+def parse_snapshot_date(text):
+    """Parse an effective date from a sheet or file name ("2025-03-01", "dec 2024").
+
+    Returns None when the name holds no valid date.
+    """
+    iso = re.search(r'(\d{4})-(\d{1,2})(?:-(\d{1,2}))?', text)
+    if iso:
+        year, month, day = iso.groups()
+        try:
+            return date(int(year), int(month), int(day or 1))
+        except ValueError:
+            return None
+
+    named = MONTH_PATTERN.search(text.lower())
+    if named:
+        return date(int(named.group(2)), MONTHS[named.group(1)[:3]], 1)
+    return None
+
+def load_pricing_snapshots(directory=PRICING_DIRECTORY):
+    """Load every pricing workbook in a directory as (effective_date, df) pairs.
+
+    Each sheet whose name parses as a date is its own snapshot; otherwise the
+    date comes from the file name. Sheets without the price columns (notes,
+    metadata) are skipped. Sheets sharing an effective date are merged, with
+    later files and sheets winning for models listed in both. Snapshots are
+    returned oldest first, one per date.
+    """
+    import pandas as pd
+
+    price_columns = {LLMCostCalculator.input_price_col, LLMCostCalculator.output_price_col}
+    snapshots = {}
+    for file_path in sorted(Path(directory).glob("*.xlsx")):
+        try:
+            sheets = pd.read_excel(file_path, sheet_name=None)
+        except Exception as e:
+            raise Exception(f"Error loading Excel file {file_path.name}: {e}")
+
+        file_date = parse_snapshot_date(file_path.stem)
+        for sheet_name, df in sheets.items():
+            if not price_columns.issubset(df.columns) or len(df.columns) < 2:
+                continue
+            effective_date = parse_snapshot_date(str(sheet_name)) or file_date
+            if effective_date is None:
+                raise Exception(f"No effective date in sheet '{sheet_name}' of {file_path.name}")
+
+            existing = snapshots.get(effective_date)
+            if existing is not None:
+                if existing.columns[1] != df.columns[1]:
+                    raise Exception(
+                        f"Cannot merge sheet '{sheet_name}' of {file_path.name} into the "
+                        f"{effective_date} snapshot: model columns differ"
+                    )
+                # Newer rows first so the calculator's drop_duplicates keeps them
+                df = pd.concat([df, existing], ignore_index=True)
+            snapshots[effective_date] = df
+
+    if not snapshots:
+        raise Exception(f"No pricing sheets found in {directory}")
+    return sorted(snapshots.items(), key=lambda snapshot: snapshot[0])
+
 def get_numeric_columns(df):
     """Return numeric columns from dataframe"""
     return df.select_dtypes(include=['float64', 'int64']).columns
 
 def get_categorical_columns(df):
     """Return categorical columns from dataframe"""
-    return df.select_dtypes(include=['object']).columns 
\ No newline at end of file
+    return df.select_dtypes(include=['object']).columns
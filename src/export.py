@@ -0,0 +1,184 @@
+import csv
+import importlib.util
+from itertools import islice
+
+from src.pricing_store import price_record_batch
+
+# format -> (mime type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', '.arrow'),
+}
+
+DEFAULT_BATCH_SIZE = 65536
+
+# Fixed column types for the per-request cost table (pyarrow type aliases), so
+# a column that happens to be empty in the first batch is not typed as null
+REQUEST_COST_SCHEMA = [
+    ('timestamp', 'timestamp[s]'),
+    ('model', 'string'),
+    ('tenant', 'string'),
+    ('input_tokens', 'int64'),
+    ('output_tokens', 'int64'),
+    ('input_cost', 'double'),
+    ('output_cost', 'double'),
+    ('total_cost', 'double'),
+]
+
+
+def available_formats():
+    """Export formats usable here; Parquet and Arrow need the optional pyarrow package"""
+    if importlib.util.find_spec('pyarrow') is None:
+        return ['csv']
+    return list(EXPORT_FORMATS)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Parquet/Arrow export needs pyarrow: pip install pyarrow")
+    return pa
+
+
+def row_batches(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Turn an iterable of dicts into {column: list} batches without materializing it"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        yield {column: [row.get(column) for row in chunk] for column in chunk[0]}
+
+
+def column_batches(columns, batch_size=DEFAULT_BATCH_SIZE):
+    """Slice equal-length column arrays into {column: array} batches"""
+    import numpy as np
+
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    length = len(next(iter(arrays.values()))) if arrays else 0
+    for start in range(0, length, batch_size):
+        yield {name: values[start:start + batch_size] for name, values in arrays.items()}
+
+
+def write_batches(batches, destination, fmt='csv', schema=None):
+    """Stream column batches to a file path in CSV, Parquet or Arrow IPC format.
+
+    Only one batch is held in memory at a time. schema is an optional list of
+    (column, pyarrow type alias); without it, types come from the first batch
+    and all-null columns are widened to strings. A later value that does not
+    fit its column's type raises instead of being truncated. Returns the
+    number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if fmt == 'csv' and importlib.util.find_spec('pyarrow') is None:
+        return _write_csv(batches, destination)
+    return _write_pyarrow(batches, destination, fmt, schema)
+
+
+def _write_csv(batches, destination):
+    # Pure-Python fallback; pyarrow's CSV writer is several times faster when installed
+    rows_written = 0
+    with open(destination, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        header_written = False
+        for batch in batches:
+            if not header_written:
+                writer.writerow(batch.keys())
+                header_written = True
+            columns = [values.tolist() if hasattr(values, 'tolist') else values for values in batch.values()]
+            writer.writerows(zip(*columns))
+            rows_written += len(columns[0]) if columns else 0
+    return rows_written
+
+
+def _write_pyarrow(batches, destination, fmt, schema=None):
+    pa = _require_pyarrow()
+    if schema is not None:
+        schema = pa.schema([(name, pa.type_for_alias(alias)) for name, alias in schema])
+    widened = set()
+    writer = None
+    rows_written = 0
+    try:
+        for batch in batches:
+            if schema is None:
+                inferred = pa.RecordBatch.from_pydict(batch).schema
+                # A column with no values yet would be typed null and reject later batches
+                widened = {field.name for field in inferred if pa.types.is_null(field.type)}
+                schema = pa.schema([
+                    (field.name, pa.string() if field.name in widened else field.type) for field in inferred
+                ])
+            if widened:
+                batch = dict(batch)
+                for name in widened:
+                    batch[name] = [None if value is None else str(value) for value in batch[name]]
+            # Safe casts raise on a value the first batch's types cannot hold (0.25 in an int column)
+            record_batch = pa.RecordBatch.from_arrays(
+                [pa.array(batch[field.name]).cast(field.type, safe=True) for field in schema],
+                schema=schema
+            )
+            if writer is None:
+                if fmt == 'csv':
+                    import pyarrow.csv as pa_csv
+
+                    writer = pa_csv.CSVWriter(destination, schema)
+                elif fmt == 'parquet':
+                    import pyarrow.parquet as pq
+
+                    writer = pq.ParquetWriter(destination, schema)
+                else:
+                    writer = pa.ipc.new_file(destination, schema)
+            if fmt == 'parquet':
+                writer.write_table(pa.Table.from_batches([record_batch]))
+            else:
+                writer.write_batch(record_batch)
+            rows_written += record_batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written
+
+
+def export_rows(rows, destination, fmt='csv', batch_size=DEFAULT_BATCH_SIZE):
+    """Export an iterable of dicts (strategy breakdowns, sweep rows, aggregates)"""
+    return write_batches(row_batches(rows, batch_size), destination, fmt)
+
+
+def export_columns(columns, destination, fmt='csv', batch_size=DEFAULT_BATCH_SIZE):
+    """Export {column: array} data such as flattened sweep or sensitivity grids"""
+    return write_batches(column_batches(columns, batch_size), destination, fmt)
+
+
+def request_cost_batches(records, pricing_store, batch_size=DEFAULT_BATCH_SIZE):
+    """Price a request log batch by batch with the price version in effect at each timestamp"""
+    import numpy as np
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            return
+        batch = price_record_batch(chunk, pricing_store)
+        # Keys are written as text, like attribution group keys, whatever type the log used
+        models = [None if model is None else str(model) for model in batch['model']]
+        tenants = [None if record.get('tenant') is None else str(record['tenant']) for record in chunk]
+        yield {
+            'timestamp': batch['timestamp'],
+            'model': np.array(models, dtype=object),
+            'tenant': np.array(tenants, dtype=object),
+            'input_tokens': batch['input_tokens'],
+            'output_tokens': batch['output_tokens'],
+            'input_cost': batch['input_cost'],
+            'output_cost': batch['output_cost'],
+            'total_cost': batch['total_cost'],
+        }
+
+
+def export_request_costs(records, pricing_store, destination, fmt='csv', batch_size=DEFAULT_BATCH_SIZE):
+    """Write the per-request cost table for a log without holding the whole log in memory"""
+    return write_batches(
+        request_cost_batches(records, pricing_store, batch_size), destination, fmt, schema=REQUEST_COST_SCHEMA
+    )
@@ -0,0 +1,178 @@
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+
+from src.cost_calculator import LLMCostCalculator
+from src.request_log import record_timestamp, request_tokens
+
+
+def _as_datetime(when):
+    """Naive UTC datetime for a date, datetime or ISO 8601 string"""
+    if isinstance(when, datetime):
+        return when.astimezone(timezone.utc).replace(tzinfo=None) if when.tzinfo else when
+    if isinstance(when, date):
+        return datetime(when.year, when.month, when.day)
+    return datetime.fromisoformat(str(when))
+
+
+class PricingStore:
+    """Versioned model prices indexed by effective date.
+
+    Each model keeps its own sorted history of (effective date, input $/M,
+    output $/M); a request is priced with the latest version in effect at its
+    timestamp. A model missing from a later snapshot keeps its last known price.
+    """
+
+    def __init__(self, snapshots, model_column='Model'):
+        # snapshots: iterable of (effective_date, {model: {'Input $/M': .., 'Output $/M': ..}})
+        self.model_column = model_column
+        self.snapshots = sorted(
+            ((_as_datetime(effective_date), models_data) for effective_date, models_data in snapshots),
+            key=lambda snapshot: snapshot[0],
+        )
+        if not self.snapshots:
+            raise ValueError("PricingStore needs at least one pricing snapshot")
+
+        history = {}
+        for effective_date, models_data in self.snapshots:
+            for model, prices in models_data.items():
+                history.setdefault(model, []).append((
+                    effective_date,
+                    prices[LLMCostCalculator.input_price_col],
+                    prices[LLMCostCalculator.output_price_col],
+                ))
+
+        self._history = {
+            model: tuple(list(column) for column in zip(*versions)) for model, versions in history.items()
+        }
+        self._history_arrays = None
+
+    @classmethod
+    def from_dataframes(cls, snapshots):
+        """Build a store from (effective_date, pricing df) pairs as loaded from Excel"""
+        model_column = 'Model'
+        priced = []
+        for effective_date, df in snapshots:
+            calculator = LLMCostCalculator(df)
+            model_column = calculator.model_column
+            priced.append((effective_date, calculator.models_data))
+        return cls(priced, model_column=model_column)
+
+    @property
+    def effective_dates(self):
+        return [effective_date for effective_date, _ in self.snapshots]
+
+    def calculator_at(self, when):
+        """LLMCostCalculator with the prices in effect at a given date"""
+        when = _as_datetime(when)
+        prices = {}
+        for model, (dates, input_prices, output_prices) in self._history.items():
+            index = bisect_right(dates, when) - 1
+            if index >= 0:
+                prices[model] = (float(input_prices[index]), float(output_prices[index]))
+        return LLMCostCalculator.from_prices(prices, model_column=self.model_column)
+
+    def _arrays(self):
+        # NumPy is only needed for batch pricing, so the histories are converted on first use
+        if self._history_arrays is None:
+            import numpy as np
+
+            self._history_arrays = {
+                str(model): (
+                    np.array(dates, dtype='datetime64[s]'),
+                    np.array(input_prices, dtype=float),
+                    np.array(output_prices, dtype=float),
+                )
+                for model, (dates, input_prices, output_prices) in self._history.items()
+            }
+        return self._history_arrays
+
+    def prices_at(self, models, timestamps):
+        """Vectorized as-of join: (input $/M, output $/M) arrays for each request.
+
+        Models are matched by their str() name. Requests with no model, an
+        unknown model, or dated before a model's first snapshot get NaN prices.
+        """
+        import numpy as np
+
+        history_arrays = self._arrays()
+        models = np.asarray(models, dtype=object)
+        when = np.asarray(timestamps).astype('datetime64[s]')
+        input_prices = np.full(len(models), np.nan)
+        output_prices = np.full(len(models), np.nan)
+
+        known = np.flatnonzero([model is not None for model in models])
+        if len(known) == 0:
+            return input_prices, output_prices
+
+        # Group request rows by model, then one searchsorted per model
+        keys = np.array([str(model) for model in models[known]], dtype=object)
+        unique_models, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique_models) + 1))
+
+        for index, model in enumerate(unique_models):
+            history = history_arrays.get(model)
+            if history is None:
+                continue
+            dates, model_input, model_output = history
+            rows = known[order[bounds[index]:bounds[index + 1]]]
+            version = np.searchsorted(dates, when[rows], side='right') - 1
+            valid = version >= 0
+            input_prices[rows[valid]] = model_input[version[valid]]
+            output_prices[rows[valid]] = model_output[version[valid]]
+
+        return input_prices, output_prices
+
+    def price_requests(self, models, timestamps, input_tokens, output_tokens):
+        """Cost each request with the price version in effect at its timestamp"""
+        import numpy as np
+
+        input_prices, output_prices = self.prices_at(models, timestamps)
+        input_cost = np.asarray(input_tokens, dtype=float) * input_prices / 1000000
+        output_cost = np.asarray(output_tokens, dtype=float) * output_prices / 1000000
+        return {
+            'input_cost': input_cost,
+            'output_cost': output_cost,
+            'total_cost': input_cost + output_cost
+        }
+
+
+def price_record_batch(records, pricing_store):
+    """Price a list of request log records in one as-of join.
+
+    Returns column arrays plus a 'priced' mask; records with no usable
+    timestamp, an unknown model or no price version yet get NaN costs
+    instead of raising.
+    """
+    import numpy as np
+
+    timestamps = np.empty(len(records), dtype='datetime64[s]')
+    for index, record in enumerate(records):
+        try:
+            timestamps[index] = np.datetime64(int(record_timestamp(record)), 's')
+        except (ValueError, TypeError):
+            timestamps[index] = np.datetime64('NaT')
+    models = np.array([record.get('model') for record in records], dtype=object)
+    tokens = np.array([request_tokens(record) for record in records], dtype=np.int64).reshape(-1, 2)
+
+    has_time = ~np.isnat(timestamps)
+    costs = {
+        'input_cost': np.full(len(records), np.nan),
+        'output_cost': np.full(len(records), np.nan),
+        'total_cost': np.full(len(records), np.nan),
+    }
+    if has_time.any():
+        priced_costs = pricing_store.price_requests(
+            models[has_time], timestamps[has_time], tokens[has_time, 0], tokens[has_time, 1]
+        )
+        for column, values in priced_costs.items():
+            costs[column][has_time] = values
+
+    return {
+        'timestamp': timestamps,
+        'model': models,
+        'input_tokens': tokens[:, 0],
+        'output_tokens': tokens[:, 1],
+        **costs,
+        'priced': ~np.isnan(costs['total_cost']),
+    }
@@ -0,0 +1,77 @@
+import io
+import json
+from datetime import datetime, timezone
+
+from src.token_calculator import estimate_tokens
+
+# Field names accepted for provider usage counts and raw text, in priority order
+INPUT_TOKEN_FIELDS = ('input_tokens', 'prompt_tokens')
+OUTPUT_TOKEN_FIELDS = ('output_tokens', 'completion_tokens')
+INPUT_TEXT_FIELDS = ('prompt', 'input')
+OUTPUT_TEXT_FIELDS = ('completion', 'output')
+
+
+def read_request_log(source):
+    """Yield one dict per line of a JSONL request log (path or file-like object)"""
+    if hasattr(source, 'read'):
+        handle = source
+        if isinstance(source, (io.BufferedIOBase, io.RawIOBase)):
+            handle = io.TextIOWrapper(source, encoding='utf-8')
+        yield from _parse_lines(handle)
+        return
+
+    with open(source, encoding='utf-8') as handle:
+        yield from _parse_lines(handle)
+
+
+def _parse_lines(handle):
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number} of request log: {e}")
+
+
+def first_field(record, fields):
+    """Value of the first of fields present (and not null) in record"""
+    for field in fields:
+        if record.get(field) is not None:
+            return record[field]
+    return None
+
+
+def request_tokens(record):
+    """(input_tokens, output_tokens) for a log record.
+
+    Provider usage counts (top level or under "usage") win; otherwise the
+    prompt/completion text is run through estimate_tokens.
+    """
+    usage = record.get('usage') or {}
+    counts = []
+    for token_fields, text_fields in ((INPUT_TOKEN_FIELDS, INPUT_TEXT_FIELDS),
+                                      (OUTPUT_TOKEN_FIELDS, OUTPUT_TEXT_FIELDS)):
+        tokens = first_field(usage, token_fields)
+        if tokens is None:
+            tokens = first_field(record, token_fields)
+        if tokens is None:
+            text = first_field(record, text_fields)
+            tokens = estimate_tokens(text, model=record.get('model')) if text else 0
+        counts.append(int(tokens))
+    return tuple(counts)
+
+
+def record_timestamp(record):
+    """Epoch seconds for a record's "timestamp" (epoch number or ISO 8601, naive = UTC)"""
+    value = record.get('timestamp')
+    if value is None:
+        raise ValueError("Request log record has no timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
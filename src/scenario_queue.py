@@ -0,0 +1,140 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+
+def params_hash(params):
+    """Stable hash of a sweep request, used as its cache key"""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_pair_sweep_chunk(calculator, models, queries_per_day, avg_input_tokens, avg_output_ratio):
+    """Cost every ordered pair of models at one traffic level"""
+    input_tokens = avg_input_tokens * queries_per_day
+    output_tokens = int(avg_input_tokens * avg_output_ratio) * queries_per_day
+
+    daily_costs = {
+        model: calculator.calculate_cost(model, input_tokens, output_tokens)['total_cost']
+        for model in models
+    }
+
+    rows = []
+    for model_a in models:
+        cost_a = daily_costs[model_a]
+        for model_b in models:
+            if model_a == model_b:
+                continue
+            cost_b = daily_costs[model_b]
+            rows.append({
+                'queries_per_day': queries_per_day,
+                'model_a': model_a,
+                'model_b': model_b,
+                'daily_cost_a': cost_a,
+                'daily_cost_b': cost_b,
+                'daily_difference': cost_a - cost_b,
+                'annual_difference': (cost_a - cost_b) * 365,
+            })
+    return rows
+
+
+class ScenarioJob:
+    """Handle for a submitted sweep; chunks arrive as the pool finishes them"""
+
+    def __init__(self, job_id, params, futures):
+        self.job_id = job_id
+        self.params = params
+        self._futures = futures
+
+    @property
+    def total_chunks(self):
+        return len(self._futures)
+
+    @property
+    def completed_chunks(self):
+        return sum(1 for future in self._futures if future.done())
+
+    def done(self):
+        return all(future.done() for future in self._futures)
+
+    def iter_results(self, timeout=None):
+        """Yield (chunk_index, rows) in completion order; chunks that are already done come first"""
+        index_by_future = {future: index for index, future in enumerate(self._futures)}
+        for future in as_completed(self._futures, timeout=timeout):
+            yield index_by_future[future], future.result()
+
+    def result(self, timeout=None):
+        """Block until every chunk is done and return all rows in submission order"""
+        rows = []
+        for future in self._futures:
+            rows.extend(future.result(timeout=timeout))
+        return rows
+
+
+class ScenarioQueue:
+    """Background runner for scenario sweeps, cached by parameter hash"""
+
+    def __init__(self, calculator, max_workers=4, use_processes=False, max_cached_jobs=32):
+        self.calculator = calculator
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_cls(max_workers=max_workers)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_cached_jobs = max_cached_jobs
+
+    @staticmethod
+    def pair_sweep_params(models, traffic_levels, avg_input_tokens, avg_output_ratio):
+        """Normalized parameters of a pair sweep, as stored on its job.
+
+        Models are sorted so the same selection made in a different order
+        hashes to the same cached job.
+        """
+        return {
+            'kind': 'pair_sweep',
+            'models': sorted(models, key=str),
+            'traffic_levels': [int(level) for level in traffic_levels],
+            'avg_input_tokens': avg_input_tokens,
+            'avg_output_ratio': avg_output_ratio,
+        }
+
+    def submit_pair_sweep(self, models, traffic_levels, avg_input_tokens, avg_output_ratio):
+        """Queue a sweep of every model pair across traffic levels, one chunk per level"""
+        params = self.pair_sweep_params(models, traffic_levels, avg_input_tokens, avg_output_ratio)
+        job_id = params_hash(params)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+                return job
+
+            futures = [
+                self._executor.submit(
+                    run_pair_sweep_chunk,
+                    self.calculator,
+                    params['models'],
+                    level,
+                    avg_input_tokens,
+                    avg_output_ratio,
+                )
+                for level in params['traffic_levels']
+            ]
+            job = ScenarioJob(job_id, params, futures)
+            self._jobs[job_id] = job
+
+            # Drop the oldest finished sweeps once the cache is full
+            while len(self._jobs) > self.max_cached_jobs:
+                oldest_id, oldest_job = next(iter(self._jobs.items()))
+                if not oldest_job.done():
+                    break
+                del self._jobs[oldest_id]
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Classifier overhead per query, matching the multi-model comparisons in app.py
+CLASSIFIER_INPUT_TOKENS = 100
+CLASSIFIER_OUTPUT_TOKENS = 50
+
+SWEEP_PARAMETERS = {
+    'queries_per_day': 'Queries per Day',
+    'avg_input_tokens': 'Average Input Tokens',
+    'avg_output_ratio': 'Output/Input Token Ratio',
+    'first_model_share': 'Routing % to Model 1',
+}
+
+
+def single_model_strategy(model):
+    """Strategy that sends every query to one model with no classifier"""
+    return {'classifier': None, 'models': [model], 'percentages': [100]}
+
+
+def _model_prices(calculator, model):
+    prices = calculator.models_data.get(model)
+    if prices is None:
+        raise ValueError(f"Model {model} not found in pricing data")
+    return prices[calculator.input_price_col], prices[calculator.output_price_col]
+
+
+def _routing_shares(percentages, first_model_share):
+    """Per-model routing shares (0-100), overriding model 1 if requested.
+
+    The remaining traffic is split across the other models in proportion to
+    their configured percentages.
+    """
+    shares = [np.asarray(p, dtype=float) for p in percentages]
+    if first_model_share is None or len(shares) == 1:
+        return shares
+
+    first = np.asarray(first_model_share, dtype=float)
+    rest_total = float(sum(percentages[1:]))
+    rest = []
+    for p in percentages[1:]:
+        weight = p / rest_total if rest_total else 1 / (len(percentages) - 1)
+        rest.append((100 - first) * weight)
+    return [first] + rest
+
+
+def strategy_daily_cost(calculator, strategy, queries_per_day, avg_input_tokens,
+                        avg_output_ratio, first_model_share=None):
+    """Daily cost of a routing strategy, broadcast over array-valued parameters.
+
+    Mirrors the app's cost model: every routed model is billed the full input
+    context for all queries, output only for its share, and the classifier
+    (if any) a fixed number of tokens per query.
+    """
+    queries = np.asarray(queries_per_day, dtype=float)
+    avg_input = np.asarray(avg_input_tokens, dtype=float)
+    ratio = np.asarray(avg_output_ratio, dtype=float)
+
+    context_tokens = avg_input * queries
+    output_per_query = np.floor(avg_input * ratio)
+
+    total = np.zeros(np.broadcast_shapes(queries.shape, avg_input.shape, ratio.shape,
+                                         np.shape(first_model_share)))
+    shares = _routing_shares(strategy['percentages'], first_model_share)
+    for model, share in zip(strategy['models'], shares):
+        input_price, output_price = _model_prices(calculator, model)
+        model_queries = np.floor(queries * (share / 100))
+        total = total + (context_tokens * input_price + output_per_query * model_queries * output_price) / 1000000
+
+    if strategy.get('classifier') is not None:
+        input_price, output_price = _model_prices(calculator, strategy['classifier'])
+        total = total + queries * (
+            CLASSIFIER_INPUT_TOKENS * input_price + CLASSIFIER_OUTPUT_TOKENS * output_price
+        ) / 1000000
+
+    return total
+
+
+def cost_difference_surface(calculator, strategy_a, strategy_b, base_params,
+                            x_param, x_values, y_param=None, y_values=None):
+    """Cost of A minus cost of B over a 1D line or a 2D grid of parameters.
+
+    base_params holds the fixed value of every parameter in SWEEP_PARAMETERS;
+    the swept ones are replaced by x_values (and y_values). Returns an array
+    shaped (len(x_values),) or (len(y_values), len(x_values)).
+    """
+    params = dict(base_params)
+    x_values = np.asarray(x_values, dtype=float)
+    if y_param is None:
+        params[x_param] = x_values
+    else:
+        grid_x, grid_y = np.meshgrid(x_values, np.asarray(y_values, dtype=float))
+        params[x_param] = grid_x
+        params[y_param] = grid_y
+
+    cost_a = strategy_daily_cost(calculator, strategy_a, **params)
+    cost_b = strategy_daily_cost(calculator, strategy_b, **params)
+    return cost_a - cost_b
+
+
+def break_even_points(x_values, differences):
+    """x values where a 1D cost difference changes sign, linearly interpolated"""
+    x_values = np.asarray(x_values, dtype=float)
+    differences = np.asarray(differences, dtype=float)
+
+    left, right = differences[:-1], differences[1:]
+    crossings = np.nonzero((np.sign(left) != np.sign(right)) & (left != 0))[0]
+    x0, x1 = x_values[crossings], x_values[crossings + 1]
+    d0, d1 = left[crossings], right[crossings]
+    return x0 + (x1 - x0) * d0 / (d0 - d1)
+
@@ -1,47 +1,194 @@
+import codecs
+import json
 import re
+from functools import lru_cache
+from pathlib import Path
 
-def estimate_tokens(text: str) -> int:
+# Per-model-family weights fitted by src/token_calibration.py
+COEFFICIENTS_FILE = Path("data/token_coefficients.json")
+
+FEATURE_NAMES = (
+    'short_words',      # 1-2 chars
+    'average_words',    # 3-4 chars
+    'long_word_chars',  # total characters in longer words
+    'whitespace',
+    'numbers',
+    'punctuation',
+    'special',
+)
+
+DEFAULT_WEIGHTS = (
+    0.5,   # Very short words often share tokens
+    1,     # Average words
+    0.25,  # Longer words might be split into multiple tokens (~1 per 4 chars)
+    0.1,   # Whitespace usually combines with words
+    0.5,   # Numbers are often efficient
+    0.3,   # Punctuation often combines
+    1,     # Special characters often get own token
+)
+
+def model_family(model):
+    """Family key for a model name: its leading letters, e.g. "GPT-4o" -> "gpt" """
+    match = re.match(r'[a-z]+', str(model).strip().lower())
+    return match.group(0) if match else str(model).lower()
+
+@lru_cache(maxsize=None)
+def load_coefficients(path=COEFFICIENTS_FILE):
+    """Read the fitted {family: weights} table once; empty if it has not been generated"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {family: tuple(entry['weights']) for family, entry in table.get('families', {}).items()}
+
+def weights_for(model=None):
+    """Calibrated weights for a model's family, falling back to the hand-tuned defaults"""
+    if model is None:
+        return DEFAULT_WEIGHTS
+    return load_coefficients().get(model_family(model), DEFAULT_WEIGHTS)
+
+def _add_word_lengths(counts: list, lengths) -> None:
+    """Add words, given by their lengths, into counts"""
+    for length in lengths:
+        if length <= 2:
+            counts[0] += 1
+        elif length <= 4:
+            counts[1] += 1
+        else:
+            counts[2] += length
+
+def _add_other_features(counts: list, text: str) -> None:
+    """Add every feature except words into counts"""
+    counts[3] += len(re.findall(r'\s+', text))  # Spaces, newlines
+    counts[4] += len(re.findall(r'\d+', text))     # Numbers
+    counts[5] += len(re.findall(r'[.,!?;:"]', text))  # Common punctuation
+    counts[6] += len(re.findall(r'[^a-zA-Z0-9\s.,!?;:"]', text))  # Other special chars
+
+def _add_features(counts: list, text: str) -> None:
+    """Add the feature counts of text (already stripped as needed) into counts"""
+    _add_word_lengths(counts, map(len, re.findall(r'\b\w+\b', text)))
+    _add_other_features(counts, text)
+
+def token_features(text: str) -> list:
+    """Raw counts behind the estimate, in FEATURE_NAMES order"""
+    counts = [0] * len(FEATURE_NAMES)
+    # Basic cleanup
+    _add_features(counts, text.strip())
+    return counts
+
+def estimate_tokens(text: str, model=None) -> int:
     """
     More accurate token estimation based on GPT tokenization rules:
     - Splits on whitespace and punctuation
     - Accounts for common patterns in English text
     - Numbers and special characters count differently
+    Pass a model name to use its family's calibrated weights, if fitted.
     """
     if not text:
         return 0
-        
-    # Basic cleanup
-    text = text.strip()
-    
-    # Count specific patterns
-    patterns = {
-        'whitespace': len(re.findall(r'\s+', text)),  # Spaces, newlines
-        'numbers': len(re.findall(r'\d+', text)),     # Numbers
-        'punctuation': len(re.findall(r'[.,!?;:"]', text)),  # Common punctuation
-        'special': len(re.findall(r'[^a-zA-Z0-9\s.,!?;:"]', text)),  # Other special chars
-    }
-    
-    # Split into words
-    words = re.findall(r'\b\w+\b', text)
-    
-    # Calculate token estimate
-    token_count = 0
-    
-    # Words (accounting for length)
-    for word in words:
-        if len(word) <= 2:
-            token_count += 0.5  # Very short words often share tokens
-        elif len(word) <= 4:
-            token_count += 1    # Average words
-        else:
-            # Longer words might be split into multiple tokens
-            token_count += (len(word) / 4)
-    
-    # Add pattern counts
-    token_count += patterns['whitespace'] * 0.1  # Whitespace usually combines with words
-    token_count += patterns['numbers'] * 0.5     # Numbers are often efficient
-    token_count += patterns['punctuation'] * 0.3 # Punctuation often combines
-    token_count += patterns['special'] * 1       # Special characters often get own token
-    
+
+    features = token_features(text)
+    token_count = sum(weight * count for weight, count in zip(weights_for(model), features))
+
     # Round up to nearest whole token
-    return max(1, round(token_count)) 
\ No newline at end of file
+    return max(1, round(token_count))
+
+_WORD_RUN = re.compile(r'\w*')
+_WORD = re.compile(r'\w+')
+_SPACE = re.compile(r'\s')
+_DIGIT = re.compile(r'\d')
+
+def _iter_chunks(source, chunk_size):
+    if isinstance(source, (str, bytes)):
+        yield source
+    elif hasattr(source, 'read'):
+        chunk = source.read(chunk_size)
+        while chunk:
+            yield chunk
+            chunk = source.read(chunk_size)
+    else:
+        yield from source
+
+def _iter_text(source, chunk_size):
+    decoder = None
+    for chunk in _iter_chunks(source, chunk_size):
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = decoder.decode(chunk)
+        yield chunk
+    if decoder is not None:
+        yield decoder.decode(b'', final=True)
+
+def estimate_tokens_stream(source, threshold=None, model=None, chunk_size=1 << 16):
+    """
+    Streaming estimate_tokens over a file-like object or an iterable of
+    str/bytes chunks (bytes are decoded as UTF-8).
+
+    Returns (token_count, exceeded). With a threshold, reading stops as soon
+    as the running estimate exceeds it; token_count is then the partial count.
+    Without stopping early the count matches estimate_tokens on the full text.
+    Stopping early is only sound when the running count can never go down,
+    so with any negative (calibrated) weight the whole source is scanned.
+    """
+    weights = weights_for(model)
+    can_stop_early = threshold is not None and min(weights) >= 0
+    counts = [0] * len(FEATURE_NAMES)
+    # Only the length of a word split across chunks is kept, however long it grows
+    open_word = 0
+    last_char = ''
+    started = False
+    seen_text = False
+
+    for chunk in _iter_text(source, chunk_size):
+        seen_text = seen_text or bool(chunk)
+        if not started:
+            # Leading whitespace is stripped, as in estimate_tokens
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        elif not chunk:
+            continue
+
+        # Whitespace and digit runs continuing from the last chunk were already counted once
+        if _SPACE.match(last_char) and _SPACE.match(chunk):
+            counts[3] -= 1
+        if _DIGIT.match(last_char) and _DIGIT.match(chunk):
+            counts[4] -= 1
+
+        lead = _WORD_RUN.match(chunk).end()
+        if lead == len(chunk):
+            open_word += lead
+        else:
+            if open_word + lead:
+                _add_word_lengths(counts, (open_word + lead,))
+            tail = _WORD_RUN.match(chunk[::-1]).end()
+            _add_word_lengths(counts, map(len, _WORD.findall(chunk, lead, len(chunk) - tail)))
+            open_word = tail
+        _add_other_features(counts, chunk)
+        last_char = chunk[-1]
+
+        if can_stop_early:
+            # An open word already past 4 characters counts its length whatever follows;
+            # trailing whitespace is held back since it is stripped if the text ends there
+            running = list(counts)
+            if open_word > 4:
+                running[2] += open_word
+            if _SPACE.match(last_char):
+                running[3] -= 1
+            token_count = max(1, round(sum(weight * count for weight, count in zip(weights, running))))
+            if token_count > threshold:
+                return token_count, True
+
+    if not seen_text:
+        return 0, False
+    if open_word:
+        _add_word_lengths(counts, (open_word,))
+    if _SPACE.match(last_char):
+        # Trailing whitespace is stripped, as in estimate_tokens
+        counts[3] -= 1
+
+    token_count = max(1, round(sum(weight * count for weight, count in zip(weights, counts))))
+    return token_count, threshold is not None and token_count > threshold
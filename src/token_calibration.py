@@ -0,0 +1,132 @@
+"""Fit estimate_tokens weights per model family against provider token counts.
+
+Usage:
+    python -m src.token_calibration logs.jsonl [more.jsonl ...] [--output data/token_coefficients.json]
+
+Each JSONL record needs a model, the prompt and/or completion text, and the
+provider's usage counts for them (see src/request_log.py for field names).
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.request_log import (
+    INPUT_TEXT_FIELDS,
+    INPUT_TOKEN_FIELDS,
+    OUTPUT_TEXT_FIELDS,
+    OUTPUT_TOKEN_FIELDS,
+    first_field,
+    read_request_log,
+)
+from src.token_calculator import (
+    COEFFICIENTS_FILE,
+    DEFAULT_WEIGHTS,
+    FEATURE_NAMES,
+    model_family,
+    token_features,
+)
+
+ERROR_PERCENTILES = (50, 90, 99)
+
+
+def calibration_samples(records):
+    """Yield (family, text, reference_tokens) for every text with a recorded usage count"""
+    for record in records:
+        model = record.get('model')
+        if model is None:
+            continue
+        usage = record.get('usage') or {}
+        for token_fields, text_fields in ((INPUT_TOKEN_FIELDS, INPUT_TEXT_FIELDS),
+                                          (OUTPUT_TOKEN_FIELDS, OUTPUT_TEXT_FIELDS)):
+            text = first_field(record, text_fields)
+            reference = first_field(usage, token_fields)
+            if reference is None:
+                reference = first_field(record, token_fields)
+            if text and reference:
+                yield model_family(model), text, int(reference)
+
+
+def build_design_matrices(samples):
+    """Group samples by family into (features, reference counts) arrays"""
+    rows = {}
+    for family, text, reference in samples:
+        features, references = rows.setdefault(family, ([], []))
+        features.append(token_features(text))
+        references.append(reference)
+    return {
+        family: (np.array(features, dtype=float), np.array(references, dtype=float))
+        for family, (features, references) in rows.items()
+    }
+
+
+def fit_weights(features, references):
+    """Least-squares weights for one family.
+
+    Weights are left unconstrained: features are correlated (every word adds
+    whitespace), so a small negative weight is a valid correction.
+    """
+    weights, *_ = np.linalg.lstsq(features, references, rcond=None)
+    return weights
+
+
+def error_summary(features, references, weights):
+    """Error distribution of rounded estimates against reference counts"""
+    estimates = np.maximum(1, np.round(features @ np.asarray(weights, dtype=float)))
+    relative = (estimates - references) / references
+    summary = {
+        'mean_abs_error': float(np.mean(np.abs(estimates - references))),
+        'mean_relative_error': float(np.mean(relative)),
+    }
+    for percentile in ERROR_PERCENTILES:
+        summary[f'p{percentile}_abs_relative_error'] = float(np.percentile(np.abs(relative), percentile))
+    return summary
+
+
+def calibrate(records, min_samples=50):
+    """Fit every family with enough samples; returns the coefficient table with error reports"""
+    families = {}
+    for family, (features, references) in sorted(build_design_matrices(calibration_samples(records)).items()):
+        if len(references) < min_samples:
+            continue
+        weights = fit_weights(features, references)
+        families[family] = {
+            'weights': [round(float(weight), 6) for weight in weights],
+            'samples': int(len(references)),
+            'default_error': error_summary(features, references, DEFAULT_WEIGHTS),
+            'fitted_error': error_summary(features, references, weights),
+        }
+    return {'features': list(FEATURE_NAMES), 'families': families}
+
+
+def write_coefficients(table, path=COEFFICIENTS_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit token estimation weights per model family")
+    parser.add_argument('corpus', nargs='+', help="JSONL logs with text and provider usage counts")
+    parser.add_argument('--output', default=str(COEFFICIENTS_FILE), help="Coefficient table to write")
+    parser.add_argument('--min-samples', type=int, default=50, help="Skip families with fewer samples")
+    args = parser.parse_args(argv)
+
+    records = (record for path in args.corpus for record in read_request_log(path))
+    table = calibrate(records, min_samples=args.min_samples)
+    if not table['families']:
+        parser.error(f"No model family had at least {args.min_samples} usable samples")
+    write_coefficients(table, args.output)
+
+    for family, entry in table['families'].items():
+        before, after = entry['default_error'], entry['fitted_error']
+        print(f"{family}: {entry['samples']} samples")
+        for metric in after:
+            print(f"  {metric:28s} {before[metric]:>10.4f} -> {after[metric]:>10.4f}")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,85 @@
-import plotly.express as px
-import plotly.graph_objects as go
+# Plotly is imported inside each function: it is only needed once a chart is drawn
 
 def create_histogram(df, column):
     """Create histogram for numeric data"""
+    import plotly.express as px
+
     fig = px.histogram(df, x=column, title=f"Distribution of {column}")
     return fig
 
 def create_bar_chart(df, x_col, y_col):
     """Create bar chart"""
+    import plotly.express as px
+
     fig = px.bar(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
     return fig
 
 def create_scatter_plot(df, x_col, y_col):
     """Create scatter plot"""
+    import plotly.express as px
+
     fig = px.scatter(df, x=x_col, y=y_col, title=f"{y_col} vs {x_col}")
-    return fig 
\ No newline at end of file
+    return fig
+
+def create_heatmap(matrix, x_labels, y_labels, title, colorbar_title="Value"):
+    """Create heatmap for a 2D matrix, diverging around zero"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=matrix,
+        x=x_labels,
+        y=y_labels,
+        colorscale="RdBu_r",
+        zmid=0,
+        colorbar=dict(title=colorbar_title),
+    ))
+    fig.update_layout(title=title)
+    return fig
+
+def create_contour(matrix, x_values, y_values, x_title, y_title, title, colorbar_title="Value"):
+    """Create contour plot for a 2D surface with the zero level highlighted"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Contour(
+        z=matrix,
+        x=x_values,
+        y=y_values,
+        colorscale="RdBu_r",
+        zmid=0,
+        colorbar=dict(title=colorbar_title),
+    ))
+    fig.add_trace(go.Contour(
+        z=matrix,
+        x=x_values,
+        y=y_values,
+        contours=dict(start=0, end=0, size=1, coloring="none", showlabels=True),
+        line=dict(color="black", width=3),
+        showscale=False,
+        name="Break-even",
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
+
+def create_line_chart(x_values, series, x_title, y_title, title, markers=None):
+    """Create line chart from {name: y_values}, with optional vertical markers"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, y_values in series.items():
+        fig.add_trace(go.Scatter(x=x_values, y=y_values, mode="lines", name=name))
+    for marker in (() if markers is None else markers):
+        fig.add_vline(x=marker, line_dash="dash", line_color="gray")
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
+
+def create_step_chart(series, x_title, y_title, title, threshold=None):
+    """Create step chart from {name: (x_values, y_values)}, with an optional limit line"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, (x_values, y_values) in series.items():
+        fig.add_trace(go.Scatter(x=x_values, y=y_values, mode="lines", line_shape="hv", name=name))
+    if threshold is not None:
+        fig.add_hline(y=threshold, line_dash="dash", line_color="red", annotation_text="Budget")
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
@@ -0,0 +1,110 @@
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from src.attribution import MISSING_KEY, CostAttribution, SpaceSaving, attribute_log_costs, dimension_key
+from src.pricing_store import PricingStore, price_record_batch
+
+JAN_2025 = 1735689600
+
+
+@pytest.fixture
+def store():
+    return PricingStore([
+        (date(2025, 1, 1), {
+            'small': {'Input $/M': 1.0, 'Output $/M': 2.0},
+            '42': {'Input $/M': 3.0, 'Output $/M': 4.0},
+        }),
+        (date(2025, 2, 1), {'small': {'Input $/M': 0.5, 'Output $/M': 1.0}}),
+    ])
+
+
+def test_dimension_key_accepts_id_fields_and_missing_values():
+    assert dimension_key({'user_id': 7}, 'user') == '7'
+    assert dimension_key({'user': 'ann', 'user_id': 7}, 'user') == 'ann'
+    assert dimension_key({}, 'tenant') == MISSING_KEY
+
+
+def test_space_saving_evicts_the_smallest_and_bounds_its_error():
+    sketch = SpaceSaving(capacity=2)
+    sketch.add('a', 5.0)
+    sketch.add('b', 1.0)
+    sketch.add('c', 2.0)  # evicts b, inheriting its total as error
+
+    items = {key: (total, error, requests) for key, total, error, requests in sketch.items()}
+    assert items == {'a': (5.0, 0.0, 1), 'c': (3.0, 1.0, 1)}
+
+
+def test_space_saving_keeps_every_heavy_hitter():
+    rng = random.Random(0)
+    weights = Counter()
+    sketch = SpaceSaving(capacity=20)
+    heavy = [f"heavy{i}" for i in range(5)]
+    for _ in range(20000):
+        key = rng.choice(heavy) if rng.random() < 0.5 else f"user{rng.randrange(5000)}"
+        weight = rng.uniform(0, 1)
+        weights[key] += weight
+        sketch.add(key, weight)
+
+    total = sum(weights.values())
+    items = {key: (estimate, error) for key, estimate, error, _ in sketch.items()}
+    for key, true_total in weights.items():
+        if true_total > total / 20:
+            assert key in items
+    for key, (estimate, error) in items.items():
+        assert estimate - error <= weights[key] + 1e-9 <= estimate + 1e-9
+
+
+def test_cost_attribution_switches_to_sketch_past_max_groups():
+    attribution = CostAttribution('user', max_groups=3)
+    for key, cost in [('a', 10.0), ('b', 1.0), ('c', 2.0), ('a', 5.0)]:
+        attribution.add(key, cost, input_tokens=100, output_tokens=10)
+    assert attribution.exact
+    assert attribution.top(1) == [{
+        'user': 'a', 'cost': 15.0, 'requests': 2, 'input_tokens': 200, 'output_tokens': 20, 'cost_error': 0.0,
+    }]
+
+    attribution.add('d', 4.0)
+
+    assert not attribution.exact
+    assert attribution.total_cost == 22.0
+    assert attribution.total_requests == 5
+    top = attribution.top(2)
+    assert [row['user'] for row in top] == ['a', 'd']
+    assert top[1]['cost'] == 5.0 and top[1]['cost_error'] == 1.0
+
+
+def test_price_record_batch_marks_unpriceable_rows(store):
+    records = [
+        {'timestamp': JAN_2025, 'model': 'small', 'input_tokens': 1000000, 'output_tokens': 0},
+        {'timestamp': JAN_2025, 'input_tokens': 10},
+        {'timestamp': JAN_2025, 'model': 42, 'input_tokens': 1000000},
+        {'timestamp': JAN_2025, 'model': 'unknown', 'input_tokens': 10},
+        {'timestamp': 'not a date', 'model': 'small', 'input_tokens': 10},
+        {'timestamp': JAN_2025 - 1, 'model': 'small', 'input_tokens': 10},
+    ]
+
+    batch = price_record_batch(records, store)
+
+    assert batch['priced'].tolist() == [True, False, True, False, False, False]
+    assert batch['total_cost'][0] == pytest.approx(1.0)
+    assert batch['total_cost'][2] == pytest.approx(3.0)
+
+
+def test_attribute_log_costs_uses_price_versions_and_counts_unpriced(store):
+    records = [
+        {'timestamp': JAN_2025, 'model': 'small', 'tenant': 'acme', 'input_tokens': 1000000},
+        {'timestamp': JAN_2025 + 40 * 86400, 'model': 'small', 'tenant': 'acme', 'input_tokens': 1000000},
+        {'timestamp': JAN_2025, 'model': 42, 'tenant': 7, 'input_tokens': 1000000},
+        {'timestamp': JAN_2025, 'tenant': 'acme', 'input_tokens': 10},
+        {'model': 'small', 'tenant': 'acme', 'input_tokens': 10},
+    ]
+
+    attributions, unpriced = attribute_log_costs(records, store, dimensions=('tenant', 'model'), batch_size=2)
+
+    assert unpriced == 2
+    tenants = {row['tenant']: row['cost'] for row in attributions['tenant'].top(10)}
+    assert tenants == {'acme': pytest.approx(1.5), '7': pytest.approx(3.0)}
+    assert attributions['model'].total_requests == 3
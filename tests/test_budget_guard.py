@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from src.budget_guard import BudgetGuard, SlidingWindowCounter
+from src.cost_calculator import LLMCostCalculator
+
+
+def make_guard(prices, **kwargs):
+    return BudgetGuard(LLMCostCalculator.from_prices(prices), **kwargs)
+
+
+def test_window_expires_old_buckets():
+    counter = SlidingWindowCounter(window_seconds=300, bucket_seconds=60)
+    counter.add(0, 1.0)
+    counter.add(130, 2.0)
+
+    assert counter.value(200) == 3.0
+    assert counter.value(300) == 2.0  # bucket 0 left the window
+    assert counter.value(360) == 2.0
+    assert counter.value(420) == 0.0
+
+
+def test_window_clears_after_a_long_gap():
+    counter = SlidingWindowCounter(window_seconds=300, bucket_seconds=60)
+    counter.add(0, 1.0)
+    counter.add(10000, 4.0)
+
+    assert counter.value(10000) == 4.0
+
+
+def test_window_keeps_late_events_inside_the_window_only():
+    counter = SlidingWindowCounter(window_seconds=300, bucket_seconds=60)
+    counter.add(600, 1.0)
+    counter.add(480, 2.0)  # late but still in the window
+    counter.add(200, 5.0)  # older than the window: dropped
+
+    assert counter.value(600) == 3.0
+    assert counter.value(840) == 1.0
+
+
+def test_fallback_is_cheapest_fitting_model_for_the_token_mix():
+    rng = random.Random(0)
+    for _ in range(200):
+        prices = {f"m{i}": (rng.uniform(0.1, 30), rng.uniform(0.1, 90)) for i in range(rng.randrange(2, 40))}
+        budgets = {model: rng.choice([0.0, 0.001, 0.01, None]) for model in prices}
+        guard = make_guard(prices, model_budgets=budgets, default_model_budget=0.0)
+        input_tokens, output_tokens = rng.randrange(0, 5000), rng.randrange(0, 5000)
+        requested = rng.choice(list(prices))
+
+        decision = guard.check(requested, input_tokens, output_tokens, timestamp=0)
+
+        fitting = [
+            input_tokens * input_price / 1000000 + output_tokens * output_price / 1000000
+            for model, (input_price, output_price) in prices.items()
+            if model != requested and (budgets[model] is None or
+                                       input_tokens * input_price / 1000000
+                                       + output_tokens * output_price / 1000000 <= budgets[model])
+        ]
+        if decision.allowed:
+            assert decision.fallback_model is None
+        elif fitting:
+            assert decision.fallback_cost == pytest.approx(min(fitting))
+        else:
+            assert decision.fallback_model is None
+
+
+def test_tenant_budget_blocks_every_model():
+    guard = make_guard({'a': (1.0, 1.0), 'b': (2.0, 2.0)}, default_tenant_budget=1.0)
+    guard.record('a', 0.9, timestamp=0, tenant='acme')
+
+    decision = guard.check('a', 1000000, 0, timestamp=10, tenant='acme')
+
+    assert not decision.allowed
+    assert decision.fallback_model is None
+    assert decision.tenant_spend == pytest.approx(0.9)
+
+
+def test_replay_sorts_by_time_and_reroutes_spend():
+    guard = make_guard({'big': (10.0, 10.0), 'small': (1.0, 1.0)}, default_model_budget=15.0)
+    records = [
+        {'timestamp': 20, 'model': 'big', 'input_tokens': 1000000, 'output_tokens': 0},
+        {'timestamp': 10, 'model': 'big', 'input_tokens': 1000000, 'output_tokens': 0},
+    ]
+
+    results = list(guard.replay(records))
+
+    assert [result['timestamp'] for result in results] == [10, 20]
+    assert results[0]['allowed'] and results[0]['served_model'] == 'big'
+    assert results[0]['served_model_spend'] == pytest.approx(10.0)
+    assert not results[1]['allowed']
+    assert results[1]['served_model'] == 'small'
+    assert results[1]['served_model_spend'] == pytest.approx(1.0)
+
+
+def test_replay_without_reroute_records_no_spend_for_blocked_requests():
+    guard = make_guard({'big': (10.0, 10.0), 'small': (1.0, 1.0)}, default_model_budget=15.0)
+    records = [{'timestamp': t, 'model': 'big', 'input_tokens': 1000000, 'output_tokens': 0} for t in (1, 2, 3)]
+
+    results = list(guard.replay(records, reroute=False))
+
+    assert [result['served_model'] for result in results] == ['big', None, None]
+    assert results[1]['served_model_spend'] is None
+    assert results[2]['model_spend'] == pytest.approx(10.0)
+
+
+def test_replay_skips_unpriceable_records():
+    guard = make_guard({'gpt-4o': (2.5, 10.0)})
+    records = [
+        {'timestamp': 1, 'model': 'gpt-4o', 'input_tokens': 10},
+        {'timestamp': 2, 'model': 'gpt-4o-2024-08-06', 'input_tokens': 10},
+        {'model': 'gpt-4o', 'input_tokens': 10},
+        {'timestamp': 'yesterday', 'model': 'gpt-4o', 'input_tokens': 10},
+        {'timestamp': 3, 'input_tokens': 10},
+    ]
+
+    results = list(guard.replay(records))
+
+    assert len(results) == 1
+    assert guard.skipped_requests == 4
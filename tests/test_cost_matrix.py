@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.cost_calculator import LLMCostCalculator
+from src.cost_matrix import daily_costs, pairwise_cost_matrix
+
+
+@pytest.fixture
+def calculator():
+    return LLMCostCalculator.from_prices({'small': (0.15, 0.6), 'large': (2.5, 10.0), 'mid': (1.0, 4.0)})
+
+
+def test_price_arrays_are_aligned_and_built_once(calculator):
+    models, input_prices, output_prices = calculator.price_arrays()
+
+    assert list(models) == ['small', 'large', 'mid']
+    np.testing.assert_array_equal(input_prices, [0.15, 2.5, 1.0])
+    np.testing.assert_array_equal(output_prices, [0.6, 10.0, 4.0])
+    assert calculator.price_arrays()[1] is input_prices
+
+
+def test_daily_costs_match_calculate_cost_per_profile(calculator):
+    models, costs = daily_costs(calculator, [100, 2000], [500, 120], [1.5, 0.7])
+
+    assert costs.shape == (2, 3)
+    for row, (queries, avg_input, ratio) in enumerate([(100, 500, 1.5), (2000, 120, 0.7)]):
+        for column, model in enumerate(models):
+            expected = calculator.calculate_cost(model, avg_input * queries, int(avg_input * ratio) * queries)
+            assert costs[row, column] == pytest.approx(expected['total_cost'])
+
+
+def test_pairwise_cost_matrix_is_antisymmetric(calculator):
+    models, deltas = pairwise_cost_matrix(calculator, 100, 500, 1.5, days=365)
+
+    assert deltas.shape == (1, 3, 3)
+    np.testing.assert_allclose(deltas[0], -deltas[0].T)
+    np.testing.assert_array_equal(np.diag(deltas[0]), 0)
+    _, costs = daily_costs(calculator, 100, 500, 1.5)
+    assert deltas[0, 1, 0] == pytest.approx((costs[0, 1] - costs[0, 0]) * 365)
@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+from src.data_loader import load_pricing_snapshots, parse_snapshot_date
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("LLM metrics dec 2024", date(2024, 12, 1)),
+    ("December 2024", date(2024, 12, 1)),
+    ("prices Sept. 2025", date(2025, 9, 1)),
+    ("may 2024", date(2024, 5, 1)),
+    ("2025-03-01", date(2025, 3, 1)),
+    ("prices 2025-03", date(2025, 3, 1)),
+])
+def test_parse_snapshot_date(text, expected):
+    assert parse_snapshot_date(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "marketing 2025",
+    "junk 2024",
+    "decision 2024",
+    "mayday 2024",
+    "prices 2025-13",
+    "prices 2025-02-30",
+    "notes",
+])
+def test_parse_snapshot_date_rejects_non_dates(text):
+    assert parse_snapshot_date(text) is None
+
+
+def write_workbook(path, sheets):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openpyxl")
+    with pd.ExcelWriter(path) as writer:
+        for sheet_name, rows in sheets.items():
+            pd.DataFrame(rows).to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def price_rows(prices):
+    return [
+        {'Provider': 'x', 'Model': model, 'Input $/M': input_price, 'Output $/M': output_price}
+        for model, (input_price, output_price) in prices.items()
+    ]
+
+
+def test_load_pricing_snapshots_skips_notes_and_merges_same_date(tmp_path):
+    write_workbook(tmp_path / "a prices.xlsx", {
+        "2025-01-01": price_rows({'small': (1.0, 2.0), 'large': (10.0, 20.0)}),
+        "marketing notes": [{'Note': 'not a price sheet'}],
+    })
+    write_workbook(tmp_path / "b prices.xlsx", {
+        "2025-01-01": price_rows({'large': (8.0, 16.0), 'new': (3.0, 6.0)}),
+        "2025-06-01": price_rows({'small': (0.5, 1.0)}),
+    })
+
+    snapshots = load_pricing_snapshots(tmp_path)
+
+    assert [effective_date for effective_date, _ in snapshots] == [date(2025, 1, 1), date(2025, 6, 1)]
+    merged = snapshots[0][1].drop_duplicates(subset=['Model']).set_index('Model')
+    assert merged.loc['large', 'Input $/M'] == 8.0
+    assert sorted(merged.index) == ['large', 'new', 'small']
+
+
+def test_load_pricing_snapshots_needs_a_price_sheet(tmp_path):
+    write_workbook(tmp_path / "notes dec 2024.xlsx", {"notes": [{'Note': 'nothing here'}]})
+
+    with pytest.raises(Exception, match="No pricing sheets"):
+        load_pricing_snapshots(tmp_path)
@@ -0,0 +1,113 @@
+import csv
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.export import _write_csv, column_batches, export_columns, export_request_costs, export_rows, row_batches
+from src.pricing_store import PricingStore
+
+JAN_2025 = 1735689600
+
+
+def read_back(path, fmt):
+    """Exported file as {column: list of values}"""
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        return {column: [row[column] for row in rows] for column in rows[0]}
+
+    pa = pytest.importorskip("pyarrow")
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pydict()
+    with pa.ipc.open_file(path) as reader:
+        return reader.read_all().to_pydict()
+
+
+@pytest.fixture(params=['csv', 'parquet', 'arrow'])
+def fmt(request):
+    if request.param != 'csv':
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+def test_row_and_column_batches_split_evenly():
+    rows = [{'a': i, 'b': str(i)} for i in range(5)]
+    assert [batch['a'] for batch in row_batches(rows, batch_size=2)] == [[0, 1], [2, 3], [4]]
+
+    batches = list(column_batches({'x': np.arange(5)}, batch_size=3))
+    assert [batch['x'].tolist() for batch in batches] == [[0, 1, 2], [3, 4]]
+
+
+def test_export_rows_round_trip(tmp_path, fmt):
+    rows = [{'model': f"m{i}", 'queries': i, 'cost': i / 4, 'tenant': None if i < 2 else f"t{i}"} for i in range(5)]
+    path = tmp_path / f"rows.{fmt}"
+
+    assert export_rows(rows, path, fmt, batch_size=2) == 5
+
+    data = read_back(path, fmt)
+    if fmt == 'csv':
+        assert data['queries'] == ['0', '1', '2', '3', '4']
+        assert [float(value) for value in data['cost']] == [0, 0.25, 0.5, 0.75, 1.0]
+        assert data['tenant'] == ['', '', 't2', 't3', 't4']
+    else:
+        assert data['queries'] == [0, 1, 2, 3, 4]
+        assert data['cost'] == [0, 0.25, 0.5, 0.75, 1.0]
+        assert data['tenant'] == [None, None, 't2', 't3', 't4']
+
+
+def test_export_columns_round_trip(tmp_path, fmt):
+    columns = {'x': np.linspace(0, 1, 7), 'model_a': np.array(['a', 'b'] * 3 + ['c'], dtype=object)}
+    path = tmp_path / f"columns.{fmt}"
+
+    assert export_columns(columns, path, fmt, batch_size=3) == 7
+
+    data = read_back(path, fmt)
+    np.testing.assert_allclose([float(value) for value in data['x']], columns['x'])
+    assert data['model_a'] == columns['model_a'].tolist()
+
+
+def test_later_values_that_do_not_fit_the_first_batch_raise(tmp_path, fmt):
+    rows = [{'value': 1}, {'value': 2}, {'value': 0.25}]
+    path = tmp_path / f"mixed.{fmt}"
+
+    if fmt == 'csv':
+        pytest.importorskip("pyarrow")  # the pure-Python writer keeps every value as text
+    with pytest.raises(Exception, match="truncated"):
+        export_rows(rows, path, fmt, batch_size=2)
+
+
+def test_pure_python_csv_writer(tmp_path):
+    path = tmp_path / "fallback.csv"
+
+    assert _write_csv(row_batches([{'a': 1, 'b': 0.25}, {'a': 2, 'b': None}]), path) == 2
+
+    assert read_back(path, 'csv') == {'a': ['1', '2'], 'b': ['0.25', '']}
+
+
+def test_export_request_costs_round_trip(tmp_path, fmt):
+    store = PricingStore([(date(2025, 1, 1), {'small': {'Input $/M': 1.0, 'Output $/M': 2.0}})])
+    records = [
+        {'timestamp': JAN_2025, 'model': 'small', 'tenant': 42, 'input_tokens': 1000000, 'output_tokens': 500000},
+        {'timestamp': JAN_2025, 'tenant': 'acme', 'input_tokens': 10},
+        {'model': 'small', 'input_tokens': 10},
+    ]
+    path = tmp_path / f"request_costs.{fmt}"
+
+    assert export_request_costs(records, store, path, fmt, batch_size=2) == 3
+
+    data = read_back(path, fmt)
+    assert list(data) == [
+        'timestamp', 'model', 'tenant', 'input_tokens', 'output_tokens', 'input_cost', 'output_cost', 'total_cost',
+    ]
+    total_costs = [float(value) if value not in ('', None) else np.nan for value in data['total_cost']]
+    np.testing.assert_allclose(total_costs, [2.0, np.nan, np.nan])
+    if fmt == 'csv':
+        assert data['tenant'] == ['42', 'acme', '']
+        assert data['model'] == ['small', '', 'small']
+    else:
+        assert data['tenant'] == ['42', 'acme', None]
+        assert data['model'] == ['small', None, 'small']
+        assert data['timestamp'][2] is None
@@ -0,0 +1,70 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from src.pricing_store import PricingStore
+
+
+@pytest.fixture
+def store():
+    return PricingStore([
+        (date(2025, 1, 1), {
+            'small': {'Input $/M': 1.0, 'Output $/M': 2.0},
+            'retired': {'Input $/M': 5.0, 'Output $/M': 10.0},
+        }),
+        (date(2025, 3, 1), {
+            'small': {'Input $/M': 0.5, 'Output $/M': 1.0},
+            'new': {'Input $/M': 3.0, 'Output $/M': 6.0},
+        }),
+    ])
+
+
+def prices_of(calculator):
+    return {
+        model: (prices['Input $/M'], prices['Output $/M'])
+        for model, prices in calculator.models_data.items()
+    }
+
+
+def test_calculator_at_snapshot_boundaries(store):
+    assert prices_of(store.calculator_at(date(2025, 1, 1))) == {'small': (1.0, 2.0), 'retired': (5.0, 10.0)}
+    assert prices_of(store.calculator_at(datetime(2025, 2, 28, 23, 59, 59)))['small'] == (1.0, 2.0)
+    assert prices_of(store.calculator_at(date(2025, 3, 1)))['small'] == (0.5, 1.0)
+
+
+def test_calculator_at_carries_models_forward(store):
+    assert prices_of(store.calculator_at('2025-06-01')) == {
+        'small': (0.5, 1.0),
+        'retired': (5.0, 10.0),
+        'new': (3.0, 6.0),
+    }
+
+
+def test_calculator_before_first_snapshot_is_empty(store):
+    assert store.calculator_at(date(2024, 12, 31)).models_data == {}
+
+
+def test_prices_at_as_of_join(store):
+    models = ['small', 'small', 'small', 'new', 'new', 'retired', 'unknown']
+    timestamps = np.array([
+        '2024-12-31T23:59:59', '2025-01-01', '2025-03-01', '2025-02-01', '2025-03-02', '2026-01-01', '2025-06-01',
+    ], dtype='datetime64[s]')
+
+    input_prices, output_prices = store.prices_at(models, timestamps)
+
+    np.testing.assert_array_equal(input_prices, [np.nan, 1.0, 0.5, np.nan, 3.0, 5.0, np.nan])
+    np.testing.assert_array_equal(output_prices, [np.nan, 2.0, 1.0, np.nan, 6.0, 10.0, np.nan])
+
+
+def test_price_requests_costs_each_row_at_its_own_version(store):
+    timestamps = np.array(['2025-02-01', '2025-04-01'], dtype='datetime64[s]')
+
+    costs = store.price_requests(['small', 'small'], timestamps, [1000000, 1000000], [500000, 500000])
+
+    np.testing.assert_allclose(costs['total_cost'], [1.0 + 1.0, 0.5 + 0.5])
+
+
+def test_store_needs_a_snapshot():
+    with pytest.raises(ValueError):
+        PricingStore([])
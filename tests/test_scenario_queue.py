@@ -0,0 +1,68 @@
+import pytest
+
+from src.cost_calculator import LLMCostCalculator
+from src.scenario_queue import ScenarioQueue, params_hash, run_pair_sweep_chunk
+
+
+@pytest.fixture
+def calculator():
+    return LLMCostCalculator.from_prices({'small': (1.0, 2.0), 'large': (10.0, 30.0), 'mid': (3.0, 6.0)})
+
+
+@pytest.fixture
+def queue(calculator):
+    queue = ScenarioQueue(calculator, max_workers=2)
+    yield queue
+    queue.shutdown()
+
+
+def test_params_hash_ignores_key_order():
+    assert params_hash({'a': 1, 'b': [1, 2]}) == params_hash({'b': [1, 2], 'a': 1})
+    assert params_hash({'a': 1}) != params_hash({'a': 2})
+
+
+def test_run_pair_sweep_chunk_matches_calculate_cost(calculator):
+    rows = run_pair_sweep_chunk(calculator, ['small', 'large'], 100, 500, 1.5)
+
+    assert [(row['model_a'], row['model_b']) for row in rows] == [('small', 'large'), ('large', 'small')]
+    expected_small = calculator.calculate_cost('small', 500 * 100, 750 * 100)['total_cost']
+    expected_large = calculator.calculate_cost('large', 500 * 100, 750 * 100)['total_cost']
+    assert rows[0]['daily_cost_a'] == expected_small
+    assert rows[0]['daily_difference'] == expected_small - expected_large
+    assert rows[0]['annual_difference'] == (expected_small - expected_large) * 365
+
+
+def test_same_models_in_any_order_reuse_the_job(queue):
+    job = queue.submit_pair_sweep(['small', 'large', 'mid'], [10, 100], 500, 1.5)
+    again = queue.submit_pair_sweep(['mid', 'small', 'large'], [10, 100], 500, 1.5)
+
+    assert again is job
+    assert queue.get(job.job_id) is job
+    assert job.params['models'] == ['large', 'mid', 'small']
+
+
+def test_result_is_in_submission_order(queue):
+    job = queue.submit_pair_sweep(['small', 'large'], [1, 10, 100], 500, 1.5)
+
+    rows = job.result(timeout=10)
+
+    assert [row['queries_per_day'] for row in rows] == [1, 1, 10, 10, 100, 100]
+    assert sorted(index for index, _ in job.iter_results(timeout=10)) == [0, 1, 2]
+    assert job.done()
+    assert job.completed_chunks == job.total_chunks == 3
+
+
+def test_finished_jobs_are_evicted_oldest_first(calculator):
+    queue = ScenarioQueue(calculator, max_workers=1, max_cached_jobs=2)
+    try:
+        jobs = []
+        for level in (1, 2, 3):
+            job = queue.submit_pair_sweep(['small', 'large'], [level], 500, 1.5)
+            job.result(timeout=10)
+            jobs.append(job)
+
+        assert queue.get(jobs[0].job_id) is None
+        assert queue.get(jobs[1].job_id) is jobs[1]
+        assert queue.get(jobs[2].job_id) is jobs[2]
+    finally:
+        queue.shutdown()
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.cost_calculator import LLMCostCalculator
+from src.sensitivity import (
+    break_even_points,
+    cost_difference_surface,
+    single_model_strategy,
+    strategy_daily_cost,
+)
+
+
+@pytest.fixture
+def calculator():
+    return LLMCostCalculator.from_prices({'small': (0.15, 0.6), 'large': (2.5, 10.0), 'router': (0.1, 0.4)})
+
+
+BASE_PARAMS = {
+    'queries_per_day': 100,
+    'avg_input_tokens': 500,
+    'avg_output_ratio': 1.5,
+    'first_model_share': None,
+}
+
+
+def test_break_even_points_interpolates_each_sign_change():
+    x_values = [0, 1, 2, 3, 4]
+    differences = [-2, 2, 4, -4, -1]
+
+    np.testing.assert_allclose(break_even_points(x_values, differences), [0.5, 2.5])
+
+
+def test_break_even_points_empty_when_sign_never_changes():
+    assert len(break_even_points([0, 1, 2], [1, 2, 3])) == 0
+    assert len(break_even_points([0, 1, 2], [0, 0, 0])) == 0
+
+
+def test_break_even_points_counts_a_touch_of_zero_once():
+    np.testing.assert_allclose(break_even_points([0, 1, 2], [1, 0, -1]), [1.0])
+
+
+def test_single_model_cost_matches_calculate_cost(calculator):
+    cost = strategy_daily_cost(calculator, single_model_strategy('large'), 100, 500, 1.5)
+
+    expected = calculator.calculate_cost('large', 500 * 100, 750 * 100)['total_cost']
+    assert float(cost) == pytest.approx(expected)
+
+
+def test_routed_strategy_matches_app_cost_model(calculator):
+    strategy = {'classifier': 'router', 'models': ['small', 'large'], 'percentages': [70, 30]}
+
+    cost = strategy_daily_cost(calculator, strategy, 100, 500, 1.5)
+
+    # Full context billed to each model, output only for its share, plus the classifier
+    expected = calculator.calculate_cost('router', 100 * 100, 50 * 100)['total_cost']
+    expected += calculator.calculate_cost('small', 500 * 100, 750 * 70)['total_cost']
+    expected += calculator.calculate_cost('large', 500 * 100, 750 * 30)['total_cost']
+    assert float(cost) == pytest.approx(expected)
+
+
+def test_cost_difference_surface_line_and_grid(calculator):
+    strategy_a = single_model_strategy('large')
+    strategy_b = {'classifier': 'router', 'models': ['small', 'large'], 'percentages': [50, 50]}
+    x_values = np.linspace(1, 1000, 7)
+    y_values = np.linspace(0, 100, 5)
+
+    line = cost_difference_surface(calculator, strategy_a, strategy_b, BASE_PARAMS, 'queries_per_day', x_values)
+    grid = cost_difference_surface(
+        calculator, strategy_a, strategy_b, BASE_PARAMS,
+        'queries_per_day', x_values, 'first_model_share', y_values
+    )
+
+    assert line.shape == (7,)
+    assert grid.shape == (5, 7)
+    for column, queries in enumerate(x_values):
+        params = dict(BASE_PARAMS, queries_per_day=queries)
+        expected = (strategy_daily_cost(calculator, strategy_a, **params)
+                    - strategy_daily_cost(calculator, strategy_b, **params))
+        assert line[column] == pytest.approx(float(expected))
+
+        params['first_model_share'] = y_values[2]
+        expected = (strategy_daily_cost(calculator, strategy_a, **params)
+                    - strategy_daily_cost(calculator, strategy_b, **params))
+        assert grid[2, column] == pytest.approx(float(expected))
+
+
+def test_identical_strategies_have_zero_difference(calculator):
+    strategy = single_model_strategy('small')
+    x_values = np.linspace(1, 5000, 50)
+
+    differences = cost_difference_surface(calculator, strategy, strategy, BASE_PARAMS, 'avg_input_tokens', x_values)
+
+    assert not differences.any()
+    assert len(break_even_points(x_values, differences)) == 0
@@ -0,0 +1,41 @@
+import random
+import re
+import string
+
+from src.token_calculator import estimate_tokens
+
+ALPHABET = string.ascii_letters[:8] + "0123  \n\t.,!?\"'()-_é€"
+
+
+def original_estimate_tokens(text):
+    """The hand-tuned formula as it stood before weights were made configurable"""
+    if not text:
+        return 0
+    text = text.strip()
+    token_count = 0
+    for word in re.findall(r'\b\w+\b', text):
+        if len(word) <= 2:
+            token_count += 0.5
+        elif len(word) <= 4:
+            token_count += 1
+        else:
+            token_count += len(word) / 4
+    token_count += len(re.findall(r'\s+', text)) * 0.1
+    token_count += len(re.findall(r'\d+', text)) * 0.5
+    token_count += len(re.findall(r'[.,!?;:"]', text)) * 0.3
+    token_count += len(re.findall(r'[^a-zA-Z0-9\s.,!?;:"]', text)) * 1
+    return max(1, round(token_count))
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(0, 150)))
+        for _ in range(count)
+    ]
+
+
+def test_default_weights_match_original_formula():
+    for text in random_texts(3000) + ["", " ", "\n", "Hello, world! 42 tokens."]:
+        assert estimate_tokens(text) == original_estimate_tokens(text)
+
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.token_calculator import FEATURE_NAMES
+from src.token_calibration import calibrate, fit_weights
+
+
+def test_fit_weights_recovers_known_weights():
+    rng = np.random.default_rng(0)
+    known = np.array([0.4, 1.1, 0.3, -0.05, 0.6, 0.2, 0.9])
+    features = rng.integers(0, 50, size=(500, len(FEATURE_NAMES))).astype(float)
+
+    weights = fit_weights(features, features @ known)
+
+    np.testing.assert_allclose(weights, known, atol=1e-8)
+
+
+def test_calibrate_fits_each_family_and_reports_errors():
+    rng = np.random.default_rng(1)
+    words = ["the", "a", "tokenization", "of", "cat", "international", "42", "hello,", "world!"]
+    records = []
+    for i in range(200):
+        text = ' '.join(rng.choice(words, size=rng.integers(5, 40)))
+        records.append({
+            'model': 'gpt-4o' if i % 2 else 'claude-3',
+            'prompt': text,
+            'usage': {'prompt_tokens': len(text) // 4 + 1},
+        })
+
+    table = calibrate(records, min_samples=50)
+
+    assert set(table['families']) == {'gpt', 'claude'}
+    for entry in table['families'].values():
+        assert entry['samples'] == 100
+        assert len(entry['weights']) == len(FEATURE_NAMES)
+        assert entry['fitted_error']['mean_abs_error'] <= entry['default_error']['mean_abs_error']
@@ -0,0 +1,77 @@
+import io
+import random
+
+import pytest
+
+import src.token_calculator as token_calculator
+from src.token_calculator import estimate_tokens, estimate_tokens_stream
+
+# Short runs of each character class so chunk edges often split words, digits and whitespace
+ALPHABET = "ab_é" * 3 + "0123" + "  \n\t" + ".,!?\"'()-€"
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(0, 150)))
+        for _ in range(count)
+    ]
+
+
+def chunked(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_stream_matches_estimate_tokens_across_chunk_sizes(chunk_size):
+    for text in random_texts(500, seed=chunk_size) + ["", "   ", " \n a", "a \n ", "12 34", "abcdefgh"]:
+        expected = estimate_tokens(text)
+        assert estimate_tokens_stream(chunked(text, chunk_size)) == (expected, False)
+        assert estimate_tokens_stream(io.StringIO(text), chunk_size=chunk_size) == (expected, False)
+        assert estimate_tokens_stream(io.BytesIO(text.encode()), chunk_size=chunk_size) == (expected, False)
+
+
+def test_stream_skips_empty_chunks():
+    assert estimate_tokens_stream(["", "hello", "", " wor", "", "ld", ""]) == (estimate_tokens("hello world"), False)
+
+
+def test_stream_stops_early_once_threshold_is_exceeded():
+    source = io.StringIO("lorem ipsum dolor sit amet " * 10000)
+    token_count, exceeded = estimate_tokens_stream(source, threshold=100, chunk_size=256)
+    assert exceeded
+    assert token_count > 100
+    assert source.tell() < len(source.getvalue())
+
+
+def test_stream_stops_early_inside_one_long_word():
+    text = "a" * (1 << 20)
+    source = io.StringIO(text)
+
+    token_count, exceeded = estimate_tokens_stream(source, threshold=1000, chunk_size=4096)
+
+    assert exceeded
+    assert 1000 < token_count <= estimate_tokens(text)
+    assert source.tell() < len(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_stream_counts_long_words_split_across_chunks(chunk_size):
+    text = "x" * 20000 + " 1234567890" * 3 + " " + "y" * 7
+    assert estimate_tokens_stream(io.StringIO(text), chunk_size=chunk_size) == (estimate_tokens(text), False)
+
+
+def test_stream_compares_rounded_count_to_threshold():
+    text = "hello world"
+    count = estimate_tokens(text)
+    assert estimate_tokens_stream(chunked(text, 1), threshold=count) == (count, False)
+
+
+def test_stream_with_negative_weights_does_not_stop_early(monkeypatch):
+    weights = list(token_calculator.DEFAULT_WEIGHTS)
+    weights[3] = -2  # whitespace
+    monkeypatch.setattr(token_calculator, 'weights_for', lambda model=None: tuple(weights))
+
+    text = "z" * 400 + " a" * 100
+    expected = estimate_tokens(text)
+    assert estimate_tokens_stream(text) == (expected, False)
+    assert estimate_tokens_stream(io.StringIO(text), threshold=50, chunk_size=64) == (expected, expected > 50)
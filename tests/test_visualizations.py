@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("plotly")
+
+from src.visualizations import create_line_chart
+
+
+@pytest.mark.parametrize("markers", [None, np.array([]), np.array([2.5]), np.array([1.0, 3.0])])
+def test_line_chart_accepts_marker_arrays(markers):
+    fig = create_line_chart([1, 2, 3, 4], {"A": [1, 2, 3, 4], "B": [4, 3, 2, 1]}, "x", "y", "title", markers=markers)
+
+    assert len(fig.data) == 2
+    assert len(fig.layout.shapes) == (0 if markers is None else len(markers))